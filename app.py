@@ -3,30 +3,65 @@ Entrypoint for PinkLedger (Finflow) Flask application.
 
 Responsibilities:
 - Create and configure the Flask app
-- Initialize extensions (SQLAlchemy, LoginManager)
+- Initialize extensions (SQLAlchemy, LoginManager, Cache)
 - Register blueprints (auth, finance)
 - Provide a small CLI helper to initialize the database
 
 This file is intentionally small and focused on app setup (keeps single responsibility).
 """
 
+import importlib.util
 import os
 import sys
 
 # Ensure the parent directory is in PYTHONPATH so finflow package can be imported
-sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+_PARENT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if _PARENT_DIR not in sys.path:
+    sys.path.insert(0, _PARENT_DIR)
 
 # Alias this module to avoid duplicate imports between app and finflow.app
 if "finflow.app" not in sys.modules:
     sys.modules["finflow.app"] = sys.modules[__name__]
 
-from flask import Flask, redirect, url_for
-from flask_login import LoginManager, current_user
+import orjson
+from flask import Flask, redirect, session, url_for
+from flask.json.provider import DefaultJSONProvider
+from flask_caching import Cache
+from flask_login import LoginManager
 from flask_sqlalchemy import SQLAlchemy
 
+from finflow.config import engine_options
+
 # Extensions (single instances to be imported elsewhere if needed)
 db = SQLAlchemy()
 login_manager = LoginManager()
+cache = Cache()
+
+
+class ORJSONProvider(DefaultJSONProvider):
+    """
+    JSON provider backed by orjson.
+
+    date/datetime values serialize natively as ISO 8601; anything orjson does not
+    know (e.g. Decimal) falls back to Flask's default handler.
+    """
+
+    def dumps(self, obj, **kwargs) -> str:
+        # indent/separators are formatting hints; anything else needs stdlib json
+        if kwargs.keys() - {"indent", "separators"}:
+            return super().dumps(obj, **kwargs)
+        option = orjson.OPT_NON_STR_KEYS
+        if self.sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        if kwargs.get("indent"):
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, default=self.default, option=option).decode()
+
+    def loads(self, s, **kwargs):
+        # Hooks such as the session serializer's object_hook need stdlib json
+        if kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
 
 
 def create_app(test_config: dict | None = None) -> Flask:
@@ -35,6 +70,7 @@ def create_app(test_config: dict | None = None) -> Flask:
     Accepts optional test_config for easier testing.
     """
     app = Flask(__name__, instance_relative_config=True)
+    app.json = ORJSONProvider(app)
 
     # Ensure instance folder exists for SQLite DB and instance config
     os.makedirs(app.instance_path, exist_ok=True)
@@ -47,52 +83,76 @@ def create_app(test_config: dict | None = None) -> Flask:
             "DATABASE_URL", f"sqlite:///{default_db_path}"
         ),
         SQLALCHEMY_TRACK_MODIFICATIONS=False,
+        # Per-process caches go stale across workers, so caching stays off
+        # unless CACHE_TYPE names a shared backend (Redis/Memcached)
+        CACHE_TYPE=os.environ.get("CACHE_TYPE", "NullCache"),
+        CACHE_NO_NULL_WARNING=True,
+        CACHE_DEFAULT_TIMEOUT=300,
+        # None ties Flask-WTF tokens to the session lifetime, so one is generated
+        # per session instead of being re-issued whenever the hourly default expires
+        WTF_CSRF_TIME_LIMIT=(
+            int(os.environ["WTF_CSRF_TIME_LIMIT"])
+            if os.environ.get("WTF_CSRF_TIME_LIMIT")
+            else None
+        ),
     )
 
     if test_config:
         app.config.update(test_config)
 
+    # Tests default to a shared in-memory DB so they never touch DATABASE_URL
+    if app.config.get("TESTING") and "SQLALCHEMY_DATABASE_URI" not in (
+        test_config or {}
+    ):
+        app.config["SQLALCHEMY_DATABASE_URI"] = "sqlite:///:memory:"
+
+    # Pool settings depend on the final database URI (tests swap in SQLite)
+    app.config.setdefault(
+        "SQLALCHEMY_ENGINE_OPTIONS",
+        engine_options(app.config["SQLALCHEMY_DATABASE_URI"]),
+    )
+
     # Initialize extensions
     db.init_app(app)
     login_manager.init_app(app)
+    cache.init_app(app)
     login_manager.login_view = "auth.login"
 
     # Register user_loader callback for Flask-Login
     # This must be done before importing modules that use current_user
     @login_manager.user_loader
     def load_user(user_id: str):
-        """Load user by ID for Flask-Login."""
+        """
+        Load user by ID for Flask-Login.
+
+        Flask-Login memoizes the result in g for the rest of the request, so this
+        runs at most once per request however often current_user is touched.
+        """
         from finflow.auth.model import User
 
-        if not user_id:
-            return None
-        try:
-            uid = int(user_id)
-        except (TypeError, ValueError):
+        if not user_id or not user_id.isdecimal():
             return None
-        return User.query.get(uid)
+        return db.session.get(User, int(user_id))
 
     # Register blueprints using package-style imports to avoid ambiguity.
-    try:
+    # A blueprint module may not exist yet during early development; skip it if
+    # missing, but let real import errors inside an existing module surface.
+    if importlib.util.find_spec("finflow.auth.routes"):
         from finflow.auth.routes import auth_bp  # type: ignore
 
         app.register_blueprint(auth_bp, url_prefix="/auth")
-    except Exception:
-        # Blueprint may not exist yet during early development; skip if missing.
-        pass
 
-    try:
+    if importlib.util.find_spec("finflow.finance.routes"):
         from finflow.finance.routes import finance_bp  # type: ignore
 
         app.register_blueprint(finance_bp, url_prefix="/finance")
-    except Exception:
-        # Same as above
-        pass
 
     # Simple index route -> redirect to dashboard or login
     @app.route("/")
     def index():
-        if current_user.is_authenticated:
+        # The signed session cookie is enough to pick a target; the dashboard's
+        # @login_required still loads and validates the real user.
+        if session.get("_user_id"):
             return redirect(url_for("finance.dashboard"))
         return redirect(url_for("auth.login"))
 
@@ -104,6 +164,7 @@ def create_app(test_config: dict | None = None) -> Flask:
             # Import models so SQLAlchemy registers tables before create_all
             from finflow.auth import model  # noqa: F401
             from finflow.finance import models  # noqa: F401
+
             db.create_all()
             print("Initialized the database.")
 
@@ -1,11 +1,18 @@
 from __future__ import annotations
 
+import os
 from datetime import datetime
 from typing import Optional
 
 from finflow.app import db
+from finflow.common.sql import utcnow
 from flask_login import UserMixin
-from werkzeug.security import check_password_hash, generate_password_hash
+from sqlalchemy import Index, func
+
+# PBKDF2 work factor for new hashes. Existing hashes keep verifying because the
+# method and iteration count are stored alongside each hash.
+PASSWORD_HASH_ITERATIONS = int(os.environ.get("PASSWORD_HASH_ITERATIONS", 260000))
+PASSWORD_HASH_METHOD = f"pbkdf2:sha256:{PASSWORD_HASH_ITERATIONS}"
 
 
 class User(db.Model, UserMixin):
@@ -19,21 +26,35 @@ class User(db.Model, UserMixin):
 
     id: int = db.Column(db.Integer, primary_key=True)
     name: str = db.Column(db.String(100), nullable=False)
-    email: str = db.Column(db.String(120), unique=True, nullable=False, index=True)
+    email: str = db.Column(db.String(120), nullable=False)
     password_hash: str = db.Column(db.String(128), nullable=False)
     created_at: datetime = db.Column(
-        db.DateTime, default=datetime.utcnow, nullable=False
+        db.DateTime, server_default=utcnow(), nullable=False
     )
 
+    # Case-insensitive uniqueness; lookups must compare on lower(email) to use it.
+    __table_args__ = (Index("ix_users_email_lower", func.lower(email), unique=True),)
+
     def set_password(self, password: str) -> None:
         """Hash and store the password."""
-        self.password_hash = generate_password_hash(password)
+        from werkzeug.security import generate_password_hash
+
+        self.password_hash = generate_password_hash(
+            password, method=PASSWORD_HASH_METHOD, salt_length=16
+        )
 
     def check_password(self, password: str) -> bool:
         """Return True if the provided password matches the stored hash."""
-        if not self.password_hash:
+        return self.verify_password(self.password_hash, password)
+
+    @staticmethod
+    def verify_password(password_hash: Optional[str], password: str) -> bool:
+        """Check a password against a stored hash without needing a loaded User."""
+        if not password_hash:
             return False
-        return check_password_hash(self.password_hash, password)
+        from werkzeug.security import check_password_hash
+
+        return check_password_hash(password_hash, password)
 
     def to_dict(self) -> dict:
         """Return a safe dict representation (no password)."""
@@ -41,9 +62,8 @@ class User(db.Model, UserMixin):
             "id": self.id,
             "name": self.name,
             "email": self.email,
-            "created_at": self.created_at.isoformat() if self.created_at else None,
+            "created_at": self.created_at,
         }
 
     def __repr__(self) -> str:
         return f"<User id={self.id} email={self.email}>"
-
@@ -1,23 +1,40 @@
 from finflow.auth.service import authenticate_user, register_user
-from flask import Blueprint, flash, redirect, render_template, request, url_for
+from flask import (
+    Blueprint,
+    current_app,
+    flash,
+    redirect,
+    render_template,
+    request,
+    url_for,
+)
 from flask_login import current_user, login_required, login_user, logout_user
 
 auth_bp = Blueprint("auth", __name__, template_folder="../templates")
 
 
+def _cached_url(endpoint: str) -> str:
+    # Redirect targets never change once an app's blueprints are registered, so
+    # resolve each endpoint once per app (and mount point) instead of walking
+    # the URL map on every login/logout.
+    urls = current_app.extensions.setdefault("auth_redirect_urls", {})
+    key = (request.script_root, endpoint)
+    url = urls.get(key)
+    if url is None:
+        url = urls[key] = url_for(endpoint)
+    return url
+
+
 def _get_next_url():
     """Helper to determine redirect target after login/register."""
-    next_url = request.args.get("next")
-    if next_url:
-        return next_url
-    return url_for("finance.dashboard")
+    return request.args.get("next") or _cached_url("finance.dashboard")
 
 
 @auth_bp.route("/login", methods=["GET", "POST"])
 def login():
     # Redirect already authenticated users to dashboard
     if current_user.is_authenticated:
-        return redirect(url_for("finance.dashboard"))
+        return redirect(_cached_url("finance.dashboard"))
 
     if request.method == "POST":
         email = request.form.get("email", "").strip()
@@ -38,7 +55,7 @@ def login():
 @auth_bp.route("/register", methods=["GET", "POST"])
 def register():
     if current_user.is_authenticated:
-        return redirect(url_for("finance.dashboard"))
+        return redirect(_cached_url("finance.dashboard"))
 
     if request.method == "POST":
         name = request.form.get("name", "").strip()
@@ -73,4 +90,4 @@ def register():
 def logout():
     logout_user()
     flash("You have been logged out.", "info")
-    return redirect(url_for("auth.login"))
+    return redirect(_cached_url("auth.login"))
@@ -4,15 +4,40 @@ from typing import Optional, Tuple
 
 from finflow.app import db
 from finflow.auth.model import User
+from sqlalchemy import bindparam, func, insert, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import make_transient_to_detached
+
+# Login only needs the credential columns; the full User is loaded on success.
+# Emails are matched on lower(email) so the functional unique index applies.
+_LOGIN_STMT = select(User.id, User.password_hash).where(
+    func.lower(User.email) == bindparam("email")
+)
+_USER_BY_EMAIL = select(User).where(func.lower(User.email) == bindparam("email"))
+
+
+def _insert_ignoring_conflicts():
+    """
+    INSERT into users that skips rows violating a unique index, where supported.
+
+    Other dialects get a plain INSERT and report duplicates via IntegrityError.
+    """
+    dialect = db.session.get_bind().dialect.name
+    if dialect == "postgresql":
+        return postgresql.insert(User).on_conflict_do_nothing()
+    if dialect == "sqlite":
+        return sqlite.insert(User).on_conflict_do_nothing()
+    return insert(User)
 
 
 def get_user_by_email(email: str) -> Optional[User]:
     """
-    Return a User object for the given email or None if not found.
+    Return the full User row for the given email or None if not found.
     """
     if not email:
         return None
-    return User.query.filter_by(email=email.lower().strip()).first()
+    return db.session.scalars(_USER_BY_EMAIL, {"email": email.strip().lower()}).first()
 
 
 def register_user(
@@ -28,21 +53,33 @@ def register_user(
         return None, "Name, email and password are required."
 
     email_clean = email.lower().strip()
-    existing = get_user_by_email(email_clean)
-    if existing:
-        return None, "A user with this email already exists."
-
     user = User(name=name.strip(), email=email_clean)
     user.set_password(password)
 
+    # One INSERT that the lower(email) unique index turns into a no-op for
+    # existing users, instead of a lookup followed by an insert.
+    stmt = _insert_ignoring_conflicts().values(
+        name=user.name, email=user.email, password_hash=user.password_hash
+    )
     try:
-        db.session.add(user)
+        result = db.session.execute(stmt)
         db.session.commit()
-        return user, None
+    except IntegrityError:
+        db.session.rollback()
+        return None, "A user with this email already exists."
     except Exception as exc:  # pragma: no cover - surface DB errors to caller
         db.session.rollback()
         return None, f"Database error: {exc}"
 
+    if not result.rowcount:
+        return None, "A user with this email already exists."
+
+    # Attach the known row to the session without re-selecting it.
+    user.id = result.inserted_primary_key[0]
+    make_transient_to_detached(user)
+    db.session.add(user)
+    return user, None
+
 
 def authenticate_user(email: str, password: str) -> Optional[User]:
     """
@@ -51,11 +88,8 @@ def authenticate_user(email: str, password: str) -> Optional[User]:
     if not (email and password):
         return None
 
-    user = get_user_by_email(email)
-    if not user:
+    row = db.session.execute(_LOGIN_STMT, {"email": email.lower().strip()}).first()
+    if not row or not User.verify_password(row.password_hash, password):
         return None
 
-    if user.check_password(password):
-        return user
-
-    return None
+    return db.session.get(User, row.id)
@@ -8,13 +8,33 @@ Provides:
 """
 
 from functools import wraps
-from flask import jsonify, redirect, url_for
+from flask import Response, current_app, jsonify, redirect, request, session, url_for
 from flask_login import current_user
 import time
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Serialized once; anonymous API traffic only needs a fresh Response around it.
+_UNAUTH_BODY = b'{"status":"error","message":"Authentication required."}'
+
+
+def _unauth() -> Response:
+    return Response(_UNAUTH_BODY, status=401, mimetype="application/json")
+
+
+def _has_login_cookie() -> bool:
+    """
+    Cheap check for a possible logged-in user without touching the database.
+
+    False means the request is certainly anonymous; True still needs
+    current_user to confirm the user exists.
+    """
+    if session.get("_user_id"):
+        return True
+    cookie_name = current_app.config.get("REMEMBER_COOKIE_NAME", "remember_token")
+    return cookie_name in request.cookies
+
 
 def login_required_api(f):
     """
@@ -25,16 +45,8 @@ def login_required_api(f):
 
     @wraps(f)
     def decorated_function(*args, **kwargs):
-        if not current_user.is_authenticated:
-            return (
-                jsonify(
-                    {
-                        "status": "error",
-                        "message": "Authentication required.",
-                    }
-                ),
-                401,
-            )
+        if not _has_login_cookie() or not current_user.is_authenticated:
+            return _unauth()
         return f(*args, **kwargs)
 
     return decorated_function
@@ -64,10 +76,11 @@ def route_timer(f):
 
     @wraps(f)
     def decorated_function(*args, **kwargs):
-        start_time = time.time()
+        start = time.perf_counter_ns()
         result = f(*args, **kwargs)
-        duration = time.time() - start_time
-        logger.info(f"{f.__name__} took {duration:.3f}s to execute")
+        if logger.isEnabledFor(logging.INFO):
+            duration_us = (time.perf_counter_ns() - start) // 1000
+            logger.info("%s took %d us to execute", f.__name__, duration_us)
         return result
 
     return decorated_function
@@ -0,0 +1,35 @@
+"""
+SQL constructs shared by the models and migrations.
+
+Provides:
+- utcnow: server-side default stamping the current UTC time
+"""
+
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import FunctionElement
+from sqlalchemy.types import DateTime
+
+
+class utcnow(FunctionElement):
+    """Current UTC time, rendered per dialect (replaces datetime.utcnow defaults)."""
+
+    type = DateTime()
+    inherit_cache = True
+
+
+@compiles(utcnow)
+def _utcnow_default(element, compiler, **kw):
+    return "CURRENT_TIMESTAMP"
+
+
+@compiles(utcnow, "postgresql")
+def _utcnow_postgresql(element, compiler, **kw):
+    # now() is in the session time zone; the naive timestamp columns hold UTC.
+    return "timezone('utc', now())"
+
+
+@compiles(utcnow, "sqlite")
+def _utcnow_sqlite(element, compiler, **kw):
+    # CURRENT_TIMESTAMP has no fraction and so sorts apart from the
+    # "YYYY-MM-DD HH:MM:SS.ffffff" text SQLAlchemy binds; write that form instead.
+    return "strftime('%Y-%m-%d %H:%M:%f000', 'now')"
@@ -14,6 +14,48 @@ from pathlib import Path
 BASE_DIR = Path(__file__).resolve().parent
 
 
+def _is_sqlite_memory(uri: str) -> bool:
+    """True for SQLite URIs that open an in-memory database."""
+    return (
+        uri in ("sqlite://", "sqlite:///") or ":memory:" in uri or "mode=memory" in uri
+    )
+
+
+def engine_options(uri: str) -> dict:
+    """
+    Return SQLAlchemy engine options suited to the given database URI.
+
+    Server databases (Postgres/MySQL) get a sized, pre-pinged connection pool so
+    workers reuse warm connections. An in-memory SQLite database only exists on
+    its one connection, so it gets that single connection shared across threads;
+    file SQLite keeps SQLAlchemy's default pool so each thread has its own
+    connection and transaction. All keep a compiled-statement cache large enough
+    for every query the app issues.
+    """
+    # SQLAlchemy's compiled SQL cache (default 500 entries)
+    query_cache_size = int(os.environ.get("DB_QUERY_CACHE_SIZE", 1200))
+
+    if uri.startswith("sqlite"):
+        if not _is_sqlite_memory(uri):
+            return {"query_cache_size": query_cache_size}
+
+        from sqlalchemy.pool import StaticPool
+
+        return {
+            "connect_args": {"check_same_thread": False},
+            "poolclass": StaticPool,
+            "query_cache_size": query_cache_size,
+        }
+    return {
+        "query_cache_size": query_cache_size,
+        "pool_size": int(os.environ.get("DB_POOL_SIZE", 10)),
+        "max_overflow": int(os.environ.get("DB_MAX_OVERFLOW", 20)),
+        "pool_timeout": 30,
+        "pool_recycle": 1800,
+        "pool_pre_ping": True,
+    }
+
+
 class Config:
     """Base configuration."""
 
@@ -25,6 +67,7 @@ class Config:
         "DATABASE_URL", f"sqlite:///{BASE_DIR / 'database.db'}"
     )
     SQLALCHEMY_TRACK_MODIFICATIONS: bool = False
+    SQLALCHEMY_ENGINE_OPTIONS: dict = engine_options(SQLALCHEMY_DATABASE_URI)
 
     # Security & session settings
     SESSION_COOKIE_HTTPONLY: bool = True
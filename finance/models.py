@@ -7,6 +7,16 @@ Defines simple, small models for:
 - Budget
 
 Each model is intentionally compact and focused on a single responsibility.
+
+Money is stored as integer cents (`amount_cents`) so sums stay in native
+integers; `amount` exposes it as a 2dp Decimal for display and assignment.
+
+The per-user collections on User (incomes/expenses/budgets) refuse to lazy-load;
+query the model with an explicit user_id filter and limit instead.
+
+ExpenseCategoryTotal keeps running per-category expense sums, updated in the
+same flush as each ORM Expense write. Core bulk statements bypass the mapper
+events and must adjust it themselves.
 """
 
 from __future__ import annotations
@@ -17,39 +27,74 @@ from typing import Optional
 
 from finflow.app import db
 from finflow.auth.model import User
+from finflow.common.sql import utcnow
+from finflow.utils import parse_amount
 from sqlalchemy import (
+    BigInteger,
     CheckConstraint,
     Column,
     DateTime,
     ForeignKey,
+    Index,
     Integer,
-    Numeric,
     String,
+    UniqueConstraint,
+    delete,
+    event,
+    insert,
+    inspect,
+    select,
+    update,
 )
-from sqlalchemy.orm import relationship
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.hybrid import hybrid_property
+from sqlalchemy.orm import backref, relationship
+
+
+class AmountCentsMixin:
+    """Integer-cents storage with a Decimal `amount` view."""
+
+    amount_cents: int = Column(BigInteger, nullable=False)
+
+    @hybrid_property
+    def amount(self) -> Optional[Decimal]:
+        if self.amount_cents is None:
+            return None
+        return Decimal(self.amount_cents).scaleb(-2)
+
+    @amount.setter
+    def amount(self, value) -> None:
+        self.amount_cents = int(parse_amount(value).scaleb(2))
+
+    @amount.expression
+    def amount(cls):
+        return cls.amount_cents / 100.0
 
 
-class Income(db.Model):
+class Income(AmountCentsMixin, db.Model):
     __tablename__ = "incomes"
 
     id: int = Column(Integer, primary_key=True)
-    user_id: int = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
-    amount: Decimal = Column(Numeric(12, 2), nullable=False)
+    user_id: int = Column(Integer, ForeignKey("users.id"), nullable=False)
     source: str = Column(String(120), nullable=False)
-    date: datetime = Column(DateTime, default=datetime.utcnow, nullable=False)
+    date: datetime = Column(DateTime, server_default=utcnow(), nullable=False)
     note: Optional[str] = Column(String(255), nullable=True)
 
-    user = relationship("User", backref="incomes")
+    user = relationship("User", backref=backref("incomes", lazy="raise_on_sql"))
 
-    __table_args__ = (CheckConstraint("amount >= 0", name="income_amount_nonnegative"),)
+    __table_args__ = (
+        CheckConstraint("amount_cents >= 0", name="income_amount_nonnegative"),
+        # Serves "WHERE user_id = ? ORDER BY date DESC LIMIT n" without a sort
+        Index("ix_incomes_user_date", user_id, date.desc()),
+    )
 
     def to_dict(self) -> dict:
         return {
             "id": self.id,
             "user_id": self.user_id,
-            "amount": float(self.amount) if self.amount is not None else 0.0,
+            "amount": self.amount_cents / 100 if self.amount_cents is not None else 0.0,
             "source": self.source,
-            "date": self.date.isoformat() if self.date else None,
+            "date": self.date,
             "note": self.note,
         }
 
@@ -57,55 +102,185 @@ class Income(db.Model):
         return f"<Income id={self.id} user_id={self.user_id} amount={self.amount}>"
 
 
-class Expense(db.Model):
+class Expense(AmountCentsMixin, db.Model):
     __tablename__ = "expenses"
 
     id: int = Column(Integer, primary_key=True)
-    user_id: int = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
-    amount: Decimal = Column(Numeric(12, 2), nullable=False)
+    user_id: int = Column(Integer, ForeignKey("users.id"), nullable=False)
     category: str = Column(String(50), nullable=False)
-    date: datetime = Column(DateTime, default=datetime.utcnow, nullable=False)
+    date: datetime = Column(DateTime, server_default=utcnow(), nullable=False)
     note: Optional[str] = Column(String(255), nullable=True)
 
-    user = relationship("User", backref="expenses")
+    user = relationship("User", backref=backref("expenses", lazy="raise_on_sql"))
 
     __table_args__ = (
-        CheckConstraint("amount >= 0", name="expense_amount_nonnegative"),
+        CheckConstraint("amount_cents >= 0", name="expense_amount_nonnegative"),
+        Index("ix_expenses_user_date", user_id, date.desc()),
+        Index("ix_expenses_user_category", user_id, category),
     )
 
     def to_dict(self) -> dict:
         return {
             "id": self.id,
             "user_id": self.user_id,
-            "amount": float(self.amount) if self.amount is not None else 0.0,
+            "amount": self.amount_cents / 100 if self.amount_cents is not None else 0.0,
             "category": self.category,
-            "date": self.date.isoformat() if self.date else None,
+            "date": self.date,
             "note": self.note,
         }
 
     def __repr__(self) -> str:
-        return f"<Expense id={self.id} user_id={self.user_id} amount={self.amount} category={self.category}>"
+        return (
+            f"<Expense id={self.id} user_id={self.user_id} amount={self.amount} "
+            f"category={self.category}>"
+        )
 
 
-class Budget(db.Model):
+class ExpenseCategoryTotal(db.Model):
+    """Precomputed SUM(amount_cents) and COUNT(*) of a user's expenses by category."""
+
+    __tablename__ = "expense_category_totals"
+
+    user_id: int = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    category: str = Column(String(50), primary_key=True)
+    total_cents: int = Column(BigInteger, nullable=False, default=0)
+    expense_count: int = Column(Integer, nullable=False, default=0)
+
+    def __repr__(self) -> str:
+        return (
+            f"<ExpenseCategoryTotal user_id={self.user_id} "
+            f"category={self.category} total_cents={self.total_cents}>"
+        )
+
+
+def add_to_category_total(
+    connection, user_id: int, category: str, delta: int, count_delta: int
+) -> None:
+    """
+    Add `delta` cents and `count_delta` expenses to the (user_id, category) row.
+
+    The row is created on first use and deleted with its last expense, so the
+    rows match GROUP BY category over expenses, zero-sum categories included.
+    """
+    if not (delta or count_delta):
+        return
+    table = ExpenseCategoryTotal.__table__
+    dialect = connection.dialect.name
+    if dialect in ("postgresql", "sqlite"):
+        stmt = (postgresql if dialect == "postgresql" else sqlite).insert(table)
+        stmt = stmt.values(
+            user_id=user_id,
+            category=category,
+            total_cents=delta,
+            expense_count=count_delta,
+        )
+        connection.execute(
+            stmt.on_conflict_do_update(
+                index_elements=[table.c.user_id, table.c.category],
+                set_={
+                    "total_cents": table.c.total_cents + stmt.excluded.total_cents,
+                    "expense_count": table.c.expense_count
+                    + stmt.excluded.expense_count,
+                },
+            )
+        )
+    else:
+        result = connection.execute(
+            update(table)
+            .where(table.c.user_id == user_id, table.c.category == category)
+            .values(
+                total_cents=table.c.total_cents + delta,
+                expense_count=table.c.expense_count + count_delta,
+            )
+        )
+        if result.rowcount == 0:
+            connection.execute(
+                insert(table).values(
+                    user_id=user_id,
+                    category=category,
+                    total_cents=delta,
+                    expense_count=count_delta,
+                )
+            )
+    if count_delta < 0:
+        connection.execute(
+            delete(table).where(
+                table.c.user_id == user_id,
+                table.c.category == category,
+                table.c.expense_count <= 0,
+            )
+        )
+
+
+@event.listens_for(Expense, "after_insert")
+def _expense_inserted(mapper, connection, target: Expense) -> None:
+    add_to_category_total(
+        connection, target.user_id, target.category, target.amount_cents, 1
+    )
+
+
+@event.listens_for(Expense, "after_delete")
+def _expense_deleted(mapper, connection, target: Expense) -> None:
+    add_to_category_total(
+        connection, target.user_id, target.category, -target.amount_cents, -1
+    )
+
+
+@event.listens_for(Expense, "before_update")
+def _expense_updating(mapper, connection, target: Expense) -> None:
+    state = inspect(target)
+    if not any(
+        state.attrs[key].history.has_changes()
+        for key in ("user_id", "category", "amount_cents")
+    ):
+        return
+    # Old values are usually expired by the previous commit, so read the row
+    # as stored rather than relying on attribute history.
+    old = connection.execute(
+        select(Expense.user_id, Expense.category, Expense.amount_cents).where(
+            Expense.id == target.id
+        )
+    ).one()
+    if (old.user_id, old.category) == (target.user_id, target.category):
+        add_to_category_total(
+            connection,
+            target.user_id,
+            target.category,
+            target.amount_cents - old.amount_cents,
+            0,
+        )
+        return
+    add_to_category_total(connection, old.user_id, old.category, -old.amount_cents, -1)
+    add_to_category_total(
+        connection, target.user_id, target.category, target.amount_cents, 1
+    )
+
+
+class Budget(AmountCentsMixin, db.Model):
     __tablename__ = "budgets"
 
     id: int = Column(Integer, primary_key=True)
     user_id: int = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
     month: str = Column(String(7), nullable=False, comment="Format: YYYY-MM")
-    amount: Decimal = Column(Numeric(12, 2), nullable=False)
 
-    user = relationship("User", backref="budgets")
+    user = relationship("User", backref=backref("budgets", lazy="raise_on_sql"))
 
-    __table_args__ = (CheckConstraint("amount >= 0", name="budget_amount_nonnegative"),)
+    __table_args__ = (
+        CheckConstraint("amount_cents >= 0", name="budget_amount_nonnegative"),
+        # One budget per user and month; set_budget upserts against this key
+        UniqueConstraint("user_id", "month", name="uq_budgets_user_month"),
+    )
 
     def to_dict(self) -> dict:
         return {
             "id": self.id,
             "user_id": self.user_id,
             "month": self.month,
-            "amount": float(self.amount) if self.amount is not None else 0.0,
+            "amount": self.amount_cents / 100 if self.amount_cents is not None else 0.0,
         }
 
     def __repr__(self) -> str:
-        return f"<Budget id={self.id} user_id={self.user_id} month={self.month} amount={self.amount}>"
+        return (
+            f"<Budget id={self.id} user_id={self.user_id} month={self.month} "
+            f"amount={self.amount}>"
+        )
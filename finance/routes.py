@@ -1,17 +1,24 @@
 from __future__ import annotations
 
+import re
+import time
 from datetime import datetime
+from functools import lru_cache
 from typing import Any, Dict, List, Optional, Tuple
 
 from finflow.app import db
+from finflow.finance.models import Budget, Expense, Income
 from flask import (
     Blueprint,
+    Response,
+    abort,
     current_app,
     flash,
     jsonify,
     redirect,
     render_template,
     request,
+    stream_with_context,
     url_for,
 )
 from flask_login import current_user, login_required
@@ -29,13 +36,282 @@ except Exception:
     svc = None  # type: ignore
 
 
-def _parse_amount(value: Optional[str]) -> Tuple[Optional[float], Optional[str]]:
+# Plain decimal amounts only; rejecting anything else up front keeps malformed
+# input off float()'s exception path.
+_AMOUNT_RE = re.compile(r"-?\d+(?:\.\d+)?")
+
+
+def _parse_amount(value: Any) -> Tuple[Optional[float], Optional[str]]:
     if value is None:
         return None, "Amount is required"
-    try:
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        # JSON bodies may carry numbers rather than strings
         return float(value), None
-    except (ValueError, TypeError):
+    if not isinstance(value, str):
+        return None, "Invalid amount"
+    value = value.strip()
+    if not _AMOUNT_RE.fullmatch(value):
         return None, "Invalid amount"
+    return float(value), None
+
+
+def _parse_cursor() -> Tuple[Optional[Tuple[datetime, int]], Optional[str]]:
+    """Read the ?after_date=&after_id= keyset cursor. Returns (cursor, error)."""
+    after_date = request.args.get("after_date")
+    after_id = request.args.get("after_id")
+    if after_date is None and after_id is None:
+        return None, None
+    try:
+        return (datetime.fromisoformat(after_date), int(after_id)), None
+    except (TypeError, ValueError):
+        return None, "Invalid cursor"
+
+
+def _json_page(items: List[Dict[str, Any]], limit: int, endpoint: str):
+    """
+    JSON response for one page of a list endpoint.
+
+    `items` holds up to limit + 1 rows; if the extra row is present, the URL of
+    the next page (the keyset cursor of the last row sent) goes in a Link header
+    so the body stays a plain list.
+    """
+    resp = jsonify(items[:limit])
+    if len(items) > limit:
+        last = items[limit - 1]
+        next_url = url_for(
+            endpoint, after_date=last["date"].isoformat(), after_id=last["id"]
+        )
+        resp.headers["Link"] = f'<{next_url}>; rel="next"'
+    return resp
+
+
+def _wants_json() -> bool:
+    """True if the client asked for JSON rather than HTML via the Accept header."""
+    # Browsers never mention json; skip Werkzeug's Accept parsing for them.
+    if "json" not in request.headers.get("Accept", ""):
+        return False
+    mimetypes = request.accept_mimetypes
+    return mimetypes.accept_json and not mimetypes.accept_html
+
+
+@lru_cache(maxsize=1)
+def _iso_date_for_day(day_index: int) -> str:
+    return datetime.utcnow().date().isoformat()
+
+
+def _today_iso() -> str:
+    """Today's UTC date as YYYY-MM-DD, formatted once per day."""
+    return _iso_date_for_day(int(time.time() // 86400))
+
+
+# ===== Inline fallbacks (used when the service lacks a function) =====
+def _inline_dashboard_context(uid: int) -> Dict[str, Any]:
+    totals = _inline_totals(uid)
+    # Recent incomes and expenses in one round trip, tagged by kind
+    recent = db.union_all(
+        db.select(
+            db.select(
+                db.literal("i").label("kind"),
+                Income.id,
+                Income.amount_cents,
+                Income.source.label("label"),
+                Income.date,
+            )
+            .where(Income.user_id == uid)
+            .order_by(Income.date.desc())
+            .limit(5)
+            .subquery()
+        ),
+        db.select(
+            db.select(
+                db.literal("e").label("kind"),
+                Expense.id,
+                Expense.amount_cents,
+                Expense.category.label("label"),
+                Expense.date,
+            )
+            .where(Expense.user_id == uid)
+            .order_by(Expense.date.desc())
+            .limit(5)
+            .subquery()
+        ),
+    ).subquery()
+    incomes: List[Dict[str, Any]] = []
+    expenses: List[Dict[str, Any]] = []
+    for r in db.session.execute(db.select(recent).order_by(recent.c.date.desc())):
+        row = {"id": r.id, "amount": r.amount_cents / 100, "date": r.date}
+        if r.kind == "i":
+            row["source"] = r.label
+            incomes.append(row)
+        else:
+            row["category"] = r.label
+            expenses.append(row)
+    # Simple category aggregation
+    category_rows = (
+        db.session.query(Expense.category, db.func.sum(Expense.amount_cents))
+        .filter(Expense.user_id == uid)
+        .group_by(Expense.category)
+        .all()
+    )
+    categories = [
+        {"category": c or "Others", "amount": a / 100} for c, a in category_rows
+    ]
+    return {
+        "total_income": totals["income"],
+        "total_expense": totals["expense"],
+        "balance": totals["balance"],
+        "incomes": incomes,
+        "expenses": expenses,
+        "categories": categories,
+    }
+
+
+def _inline_create_income(
+    uid: int, amount: float, source: str, date_val: Optional[datetime]
+) -> Income:
+    inc = Income(user_id=uid, amount=amount, source=source)
+    if date_val is not None:
+        inc.date = date_val
+    db.session.add(inc)
+    db.session.commit()
+    return inc
+
+
+def _inline_create_expense(
+    uid: int, amount: float, category: str, date_val: Optional[datetime]
+) -> Expense:
+    exp = Expense(user_id=uid, amount=amount, category=category)
+    if date_val is not None:
+        exp.date = date_val
+    db.session.add(exp)
+    db.session.commit()
+    return exp
+
+
+def _inline_delete_income(uid: int, item_id: int) -> bool:
+    inc = Income.query.filter_by(id=item_id, user_id=uid).first()
+    if inc is None:
+        return False
+    db.session.delete(inc)
+    db.session.commit()
+    return True
+
+
+def _inline_delete_expense(uid: int, item_id: int) -> bool:
+    exp = Expense.query.filter_by(id=item_id, user_id=uid).first()
+    if exp is None:
+        return False
+    db.session.delete(exp)
+    db.session.commit()
+    return True
+
+
+def _inline_list_incomes(
+    uid: int, limit: int, after: Optional[Tuple[datetime, int]] = None
+) -> List[Dict[str, Any]]:
+    # Plain column rows: no ORM objects to hydrate just to call to_dict()
+    stmt = db.select(
+        Income.id,
+        (Income.amount_cents / 100.0).label("amount"),
+        Income.source,
+        Income.date,
+    ).where(Income.user_id == uid)
+    if after is not None:
+        stmt = stmt.where(db.tuple_(Income.date, Income.id) < db.tuple_(*after))
+    rows = db.session.execute(
+        stmt.order_by(Income.date.desc(), Income.id.desc()).limit(limit)
+    )
+    return [dict(r._mapping) for r in rows]
+
+
+def _inline_list_expenses(
+    uid: int, limit: int, after: Optional[Tuple[datetime, int]] = None
+) -> List[Dict[str, Any]]:
+    stmt = db.select(
+        Expense.id,
+        (Expense.amount_cents / 100.0).label("amount"),
+        Expense.category,
+        Expense.date,
+    ).where(Expense.user_id == uid)
+    if after is not None:
+        stmt = stmt.where(db.tuple_(Expense.date, Expense.id) < db.tuple_(*after))
+    rows = db.session.execute(
+        stmt.order_by(Expense.date.desc(), Expense.id.desc()).limit(limit)
+    )
+    return [dict(r._mapping) for r in rows]
+
+
+def _inline_get_budget(uid: int, month: str) -> Optional[Budget]:
+    return Budget.query.filter_by(user_id=uid, month=month).first()
+
+
+def _inline_set_budget(
+    uid: int, month: str, amount: float
+) -> Tuple[Optional[Budget], Optional[str]]:
+    b = Budget.query.filter_by(user_id=uid, month=month).first()
+    if not b:
+        b = Budget(user_id=uid, month=month, amount=amount)
+        db.session.add(b)
+    else:
+        b.amount = amount
+    db.session.commit()
+    return b, None
+
+
+# Both totals in one SELECT, compiled once and reused with a bound user id
+_INLINE_TOTALS_STMT = db.select(
+    db.select(db.func.sum(Income.amount_cents))
+    .where(Income.user_id == db.bindparam("uid"))
+    .scalar_subquery()
+    .label("income"),
+    db.select(db.func.sum(Expense.amount_cents))
+    .where(Expense.user_id == db.bindparam("uid"))
+    .scalar_subquery()
+    .label("expense"),
+)
+
+
+def _inline_summary(uid: int) -> Dict[str, float]:
+    row = db.session.execute(_INLINE_TOTALS_STMT, {"uid": uid}).one()
+    # SUM over no rows is NULL
+    return {"income": (row.income or 0) / 100, "expense": (row.expense or 0) / 100}
+
+
+def _inline_totals(uid: int) -> Dict[str, float]:
+    summary = _inline_summary(uid)
+    summary["balance"] = summary["income"] - summary["expense"]
+    return summary
+
+
+def _inline_expense_by_category(uid: int) -> List[Dict[str, Any]]:
+    rows = (
+        db.session.query(Expense.category, db.func.sum(Expense.amount_cents))
+        .filter(Expense.user_id == uid)
+        .group_by(Expense.category)
+        .all()
+    )
+    return [{"category": c or "Other", "amount": a / 100} for c, a in rows]
+
+
+# Resolve each handler's implementation once at import instead of probing the
+# service module on every request.
+_get_dashboard_context = getattr(
+    svc, "get_dashboard_context", _inline_dashboard_context
+)
+_create_income = getattr(svc, "create_income", _inline_create_income)
+_create_expense = getattr(svc, "create_expense", _inline_create_expense)
+_list_incomes = getattr(svc, "list_incomes", _inline_list_incomes)
+_list_expenses = getattr(svc, "list_expenses", _inline_list_expenses)
+_delete_income = getattr(svc, "delete_income", _inline_delete_income)
+_delete_expense = getattr(svc, "delete_expense", _inline_delete_expense)
+_get_budget = getattr(svc, "get_budget", _inline_get_budget)
+_set_budget = getattr(svc, "set_budget", _inline_set_budget)
+_get_summary = getattr(svc, "get_summary", _inline_summary)
+_get_totals = getattr(svc, "get_totals", _inline_totals)
+_expense_by_category = getattr(svc, "expense_by_category", _inline_expense_by_category)
+# No inline copy of the export: it needs the service's streaming UNION ALL query,
+# so without the service layer the route answers 404.
+_export_transactions_csv_stream = getattr(svc, "export_transactions_csv_stream", None)
 
 
 # ===== Dashboard =====
@@ -46,64 +322,9 @@ def dashboard():
     Render dashboard (HTML) or return JSON summary depending on Accept header.
     Delegates business logic to the service layer when available.
     """
-    uid = current_user.id
+    ctx = _get_dashboard_context(current_user.id)
 
-    if svc and hasattr(svc, "get_dashboard_context"):
-        ctx = svc.get_dashboard_context(uid)
-    else:
-        # Minimal inline fallback implementation using models (keeps routes usable)
-        from finflow.finance.models import Budget, Expense, Income  # type: ignore
-
-        total_income = (
-            db.session.query(db.func.coalesce(db.func.sum(Income.amount), 0))
-            .filter(Income.user_id == uid)
-            .scalar()
-            or 0
-        )
-        total_expense = (
-            db.session.query(db.func.coalesce(db.func.sum(Expense.amount), 0))
-            .filter(Expense.user_id == uid)
-            .scalar()
-            or 0
-        )
-        balance = float(total_income) - float(total_expense)
-        incomes = (
-            Income.query.filter_by(user_id=uid)
-            .order_by(Income.date.desc())
-            .limit(5)
-            .all()
-        )
-        expenses = (
-            Expense.query.filter_by(user_id=uid)
-            .order_by(Expense.date.desc())
-            .limit(5)
-            .all()
-        )
-        # Simple category aggregation
-        category_rows = (
-            db.session.query(
-                Expense.category, db.func.coalesce(db.func.sum(Expense.amount), 0)
-            )
-            .filter(Expense.user_id == uid)
-            .group_by(Expense.category)
-            .all()
-        )
-        categories = [
-            {"category": c or "Others", "amount": float(a)} for c, a in category_rows
-        ]
-        ctx = {
-            "total_income": float(total_income),
-            "total_expense": float(total_expense),
-            "balance": float(balance),
-            "incomes": incomes,
-            "expenses": expenses,
-            "categories": categories,
-        }
-
-    if (
-        request.accept_mimetypes.accept_json
-        and not request.accept_mimetypes.accept_html
-    ):
+    if _wants_json():
         return jsonify(ctx)
 
     # Render template; templates expect certain variables
@@ -115,7 +336,7 @@ def dashboard():
         incomes=ctx.get("incomes", []),
         expenses=ctx.get("expenses", []),
         expense_by_category=ctx.get("categories", []),
-        today=datetime.utcnow().date().isoformat(),
+        today=_today_iso(),
     )
 
 
@@ -139,27 +360,13 @@ def add_income():
     date_str = data.get("date")
     try:
         date_val = datetime.fromisoformat(date_str).date() if date_str else None
-    except Exception:
+    except (TypeError, ValueError):
         date_val = None
 
-    if svc and hasattr(svc, "create_income"):
-        inc = svc.create_income(uid, amount, source, date_val)
-    else:
-        from finflow.finance.models import Income  # type: ignore
-
-        inc = Income(
-            user_id=uid,
-            amount=amount,
-            source=source,
-            date=date_val or datetime.utcnow(),
-        )
-        db.session.add(inc)
-        db.session.commit()
+    inc = _create_income(uid, amount, source, date_val)
 
     if request.is_json:
-        return jsonify(
-            {"status": "created", "income": getattr(inc, "to_dict", lambda: {})()}
-        ), 201
+        return jsonify({"status": "created", "income": inc.to_dict()}), 201
 
     flash("Income added.", "success")
     return redirect(url_for("finance.dashboard"))
@@ -169,30 +376,20 @@ def add_income():
 @login_required
 def list_incomes():
     """Return list of incomes for the current user as JSON."""
-    uid = current_user.id
-    if svc and hasattr(svc, "list_incomes"):
-        items = svc.list_incomes(uid)
-    else:
-        from finflow.finance.models import Income  # type: ignore
-
-        items = (
-            Income.query.filter_by(user_id=uid)
-            .order_by(Income.date.desc())
-            .limit(current_app.config.get("DEFAULT_PAGE_SIZE", 50))
-            .all()
-        )
-    # Ensure JSON-serializable
-    return jsonify(
-        [getattr(i, "to_dict", lambda: {"id": getattr(i, "id", None)})() for i in items]
-    )
+    after, err = _parse_cursor()
+    if err:
+        return jsonify({"error": err}), 400
+    limit = current_app.config.get("DEFAULT_PAGE_SIZE", 50)
+    # Both implementations return JSON-ready dicts; one extra row tells us
+    # whether a next page exists.
+    items = _list_incomes(current_user.id, limit + 1, after)
+    return _json_page(items, limit, "finance.list_incomes")
 
 
 @finance_bp.route("/income/list", methods=["GET"])
 @login_required
 def income_page():
     uid = current_user.id
-    from finflow.finance.models import Income  # type: ignore
-
     items = (
         Income.query.filter_by(user_id=uid)
         .order_by(Income.date.desc())
@@ -202,27 +399,16 @@ def income_page():
     return render_template(
         "income.html",
         incomes=items,
-        today=datetime.utcnow().date().isoformat(),
+        today=_today_iso(),
     )
 
 
 @finance_bp.route("/income/<int:item_id>", methods=["DELETE"])
 @login_required
 def delete_income(item_id: int):
-    uid = current_user.id
-    if svc and hasattr(svc, "delete_income"):
-        ok = svc.delete_income(uid, item_id)
-        status = 200 if ok else 403
-        return jsonify({"deleted": ok}), status
-    else:
-        from finflow.finance.models import Income  # type: ignore
-
-        inc = Income.query.get_or_404(item_id)
-        if inc.user_id != uid:
-            return jsonify({"error": "not authorized"}), 403
-        db.session.delete(inc)
-        db.session.commit()
-        return jsonify({"deleted": True}), 200
+    ok = _delete_income(current_user.id, item_id)
+    # Missing and not-owned look the same, so ids of other users' rows don't leak
+    return jsonify({"deleted": ok}), 200 if ok else 404
 
 
 # ===== Expense endpoints =====
@@ -241,27 +427,13 @@ def add_expense():
     date_str = data.get("date")
     try:
         date_val = datetime.fromisoformat(date_str).date() if date_str else None
-    except Exception:
+    except (TypeError, ValueError):
         date_val = None
 
-    if svc and hasattr(svc, "create_expense"):
-        exp = svc.create_expense(uid, amount, category, date_val)
-    else:
-        from finflow.finance.models import Expense  # type: ignore
-
-        exp = Expense(
-            user_id=uid,
-            amount=amount,
-            category=category,
-            date=date_val or datetime.utcnow(),
-        )
-        db.session.add(exp)
-        db.session.commit()
+    exp = _create_expense(uid, amount, category, date_val)
 
     if request.is_json:
-        return jsonify(
-            {"status": "created", "expense": getattr(exp, "to_dict", lambda: {})()}
-        ), 201
+        return jsonify({"status": "created", "expense": exp.to_dict()}), 201
 
     flash("Expense added.", "success")
     return redirect(url_for("finance.dashboard"))
@@ -270,29 +442,18 @@ def add_expense():
 @finance_bp.route("/expense", methods=["GET"])
 @login_required
 def list_expenses():
-    uid = current_user.id
-    if svc and hasattr(svc, "list_expenses"):
-        items = svc.list_expenses(uid)
-    else:
-        from finflow.finance.models import Expense  # type: ignore
-
-        items = (
-            Expense.query.filter_by(user_id=uid)
-            .order_by(Expense.date.desc())
-            .limit(current_app.config.get("DEFAULT_PAGE_SIZE", 50))
-            .all()
-        )
-    return jsonify(
-        [getattr(e, "to_dict", lambda: {"id": getattr(e, "id", None)})() for e in items]
-    )
+    after, err = _parse_cursor()
+    if err:
+        return jsonify({"error": err}), 400
+    limit = current_app.config.get("DEFAULT_PAGE_SIZE", 50)
+    items = _list_expenses(current_user.id, limit + 1, after)
+    return _json_page(items, limit, "finance.list_expenses")
 
 
 @finance_bp.route("/expense/list", methods=["GET"])
 @login_required
 def expense_page():
     uid = current_user.id
-    from finflow.finance.models import Expense  # type: ignore
-
     items = (
         Expense.query.filter_by(user_id=uid)
         .order_by(Expense.date.desc())
@@ -302,43 +463,24 @@ def expense_page():
     return render_template(
         "expense.html",
         expenses=items,
-        today=datetime.utcnow().date().isoformat(),
+        today=_today_iso(),
     )
 
 
 @finance_bp.route("/expense/<int:item_id>", methods=["DELETE"])
 @login_required
 def delete_expense(item_id: int):
-    uid = current_user.id
-    if svc and hasattr(svc, "delete_expense"):
-        ok = svc.delete_expense(uid, item_id)
-        status = 200 if ok else 403
-        return jsonify({"deleted": ok}), status
-    else:
-        from finflow.finance.models import Expense  # type: ignore
-
-        exp = Expense.query.get_or_404(item_id)
-        if exp.user_id != uid:
-            return jsonify({"error": "not authorized"}), 403
-        db.session.delete(exp)
-        db.session.commit()
-        return jsonify({"deleted": True}), 200
+    ok = _delete_expense(current_user.id, item_id)
+    # Missing and not-owned look the same, so ids of other users' rows don't leak
+    return jsonify({"deleted": ok}), 200 if ok else 404
 
 
 # ===== Budget =====
 @finance_bp.route("/budget", methods=["GET"])
 @login_required
 def budget_page():
-    uid = current_user.id
     month = request.args.get("month") or datetime.utcnow().strftime("%Y-%m")
-
-    if svc and hasattr(svc, "get_budget"):
-        b = svc.get_budget(uid, month)
-    else:
-        from finflow.finance.models import Budget  # type: ignore
-
-        b = Budget.query.filter_by(user_id=uid, month=month).first()
-
+    b = _get_budget(current_user.id, month)
     return render_template("budget.html", budget=b, current_month=month)
 
 
@@ -353,23 +495,13 @@ def set_budget():
         flash(err, "danger")
         return redirect(url_for("finance.dashboard"))
 
-    if svc and hasattr(svc, "set_budget"):
-        b = svc.set_budget(uid, month, amount)
-    else:
-        from finflow.finance.models import Budget  # type: ignore
-
-        b = Budget.query.filter_by(user_id=uid, month=month).first()
-        if not b:
-            b = Budget(user_id=uid, month=month, amount=amount)
-            db.session.add(b)
-        else:
-            b.amount = amount
-        db.session.commit()
+    b, err = _set_budget(uid, month, amount)
+    if err:
+        flash(err, "danger")
+        return redirect(url_for("finance.dashboard"))
 
     if request.is_json:
-        return jsonify(
-            {"status": "ok", "budget": getattr(b, "to_dict", lambda: {})()}
-        ), 200
+        return jsonify({"status": "ok", "budget": b.to_dict()}), 200
 
     flash("Budget set.", "success")
     return redirect(url_for("finance.dashboard"))
@@ -379,74 +511,29 @@ def set_budget():
 @finance_bp.route("/api/summary")
 @login_required
 def api_summary():
-    uid = current_user.id
-    if svc and hasattr(svc, "get_summary"):
-        summary = svc.get_summary(uid)
-    else:
-        from finflow.finance.models import Expense, Income  # type: ignore
-
-        total_income = (
-            db.session.query(db.func.coalesce(db.func.sum(Income.amount), 0))
-            .filter(Income.user_id == uid)
-            .scalar()
-            or 0
-        )
-        total_expense = (
-            db.session.query(db.func.coalesce(db.func.sum(Expense.amount), 0))
-            .filter(Expense.user_id == uid)
-            .scalar()
-            or 0
-        )
-        summary = {"income": float(total_income), "expense": float(total_expense)}
-    return jsonify(summary)
+    return jsonify(_get_summary(current_user.id))
 
 
 @finance_bp.route("/reports", methods=["GET"])
 @login_required
 def reports_page():
     uid = current_user.id
-    if svc and hasattr(svc, "get_totals"):
-        summary = svc.get_totals(uid)
-    else:
-        from finflow.finance.models import Expense, Income  # type: ignore
-
-        total_income = (
-            db.session.query(db.func.coalesce(db.func.sum(Income.amount), 0))
-            .filter(Income.user_id == uid)
-            .scalar()
-            or 0
-        )
-        total_expense = (
-            db.session.query(db.func.coalesce(db.func.sum(Expense.amount), 0))
-            .filter(Expense.user_id == uid)
-            .scalar()
-            or 0
-        )
-        summary = {
-            "income": float(total_income),
-            "expense": float(total_expense),
-            "balance": float(total_income) - float(total_expense),
-        }
-
-    if svc and hasattr(svc, "expense_by_category"):
-        categories = svc.expense_by_category(uid)
-    else:
-        from finflow.finance.models import Expense  # type: ignore
-
-        rows = (
-            db.session.query(
-                Expense.category, db.func.coalesce(db.func.sum(Expense.amount), 0)
-            )
-            .filter(Expense.user_id == uid)
-            .group_by(Expense.category)
-            .all()
-        )
-        categories = [
-            {"category": c or "Other", "amount": float(a)} for c, a in rows
-        ]
-
     return render_template(
         "reports.html",
-        summary=summary,
-        categories=categories,
+        summary=_get_totals(uid),
+        categories=_expense_by_category(uid),
+    )
+
+
+@finance_bp.route("/export.csv", methods=["GET"])
+@login_required
+def export_csv():
+    """Stream the user's transactions as a CSV download."""
+    if _export_transactions_csv_stream is None:
+        abort(404)
+    uid = current_user.id
+    return Response(
+        stream_with_context(_export_transactions_csv_stream(uid)),
+        mimetype="text/csv",
+        headers={"Content-Disposition": "attachment; filename=transactions.csv"},
     )
@@ -13,12 +13,44 @@ Notes:
 
 from __future__ import annotations
 
+import csv
 from datetime import date, datetime
-from io import StringIO
-from typing import Dict, List, Optional, Tuple
-
-from finflow.app import db
-from finflow.finance.models import Budget, Expense, Income
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from finflow.app import cache, db
+from finflow.finance.models import (
+    Budget,
+    Expense,
+    ExpenseCategoryTotal,
+    Income,
+    add_to_category_total,
+)
+from sqlalchemy import (
+    bindparam,
+    delete,
+    event,
+    func,
+    literal,
+    select,
+    tuple_,
+    union_all,
+)
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session, make_transient_to_detached, object_session
+
+# Per-user aggregates are memoized and dropped when that user's incomes or
+# expenses change (see the event hooks at the bottom of this module).
+_AGGREGATE_CACHE_TIMEOUT = 300
+
+# Built once with a bound parameter so each call reuses the compiled statement
+_TOTALS_STMT = select(
+    select(func.sum(Income.amount_cents))
+    .where(Income.user_id == bindparam("uid"))
+    .scalar_subquery(),
+    select(func.sum(Expense.amount_cents))
+    .where(Expense.user_id == bindparam("uid"))
+    .scalar_subquery(),
+)
 
 
 def add_income(
@@ -37,10 +69,11 @@ def add_income(
     except Exception:
         return None, "Invalid amount."
 
-    when = when or datetime.utcnow().date()
     src = (source or "Income").strip()
 
-    income = Income(user_id=user_id, amount=amt, source=src, date=when)
+    income = Income(user_id=user_id, amount=amt, source=src)
+    if when is not None:
+        income.date = when
     try:
         db.session.add(income)
         db.session.commit()
@@ -69,10 +102,11 @@ def add_expense(
     if not category:
         return None, "Category is required."
 
-    when = when or datetime.utcnow().date()
     cat = category.strip()
 
-    expense = Expense(user_id=user_id, amount=amt, category=cat, date=when)
+    expense = Expense(user_id=user_id, amount=amt, category=cat)
+    if when is not None:
+        expense.date = when
     try:
         db.session.add(expense)
         db.session.commit()
@@ -82,56 +116,289 @@ def add_expense(
         return None, f"Database error: {exc}"
 
 
+@cache.memoize(timeout=_AGGREGATE_CACHE_TIMEOUT)
 def get_totals(user_id: int) -> Dict[str, float]:
-    """Return aggregated totals: income, expense and balance for the user."""
-    total_income = (
-        db.session.query(db.func.coalesce(db.func.sum(Income.amount), 0))
-        .filter(Income.user_id == user_id)
-        .scalar()
-    ) or 0.0
-    total_expense = (
-        db.session.query(db.func.coalesce(db.func.sum(Expense.amount), 0))
-        .filter(Expense.user_id == user_id)
-        .scalar()
-    ) or 0.0
+    """
+    Return aggregated totals: income, expense and balance for the user.
+
+    Both sums are scalar subqueries of a single SELECT (one round trip).
+    """
+    income_cents, expense_cents = db.session.execute(
+        _TOTALS_STMT, {"uid": user_id}
+    ).one()
+    # SUM over no rows is NULL
+    income_cents = income_cents or 0
+    expense_cents = expense_cents or 0
     return {
-        "income": float(total_income),
-        "expense": float(total_expense),
-        "balance": float(total_income) - float(total_expense),
+        "income": income_cents / 100,
+        "expense": expense_cents / 100,
+        "balance": (income_cents - expense_cents) / 100,
     }
 
 
-def get_recent_incomes(user_id: int, limit: int = 5) -> List[Income]:
-    """Return recent incomes ordered by date desc."""
-    return (
-        Income.query.filter_by(user_id=user_id)
+def get_summary(user_id: int) -> Dict[str, float]:
+    """Return {income, expense} totals for the chart API (shares get_totals' cache)."""
+    totals = get_totals(user_id)
+    return {"income": totals["income"], "expense": totals["expense"]}
+
+
+def get_recent_incomes(user_id: int, limit: int = 5) -> List[Dict[str, Any]]:
+    """Return recent incomes ordered by date desc, as {id, amount, source, date}."""
+    rows = db.session.execute(
+        select(Income.id, Income.amount_cents, Income.source, Income.date)
+        .where(Income.user_id == user_id)
         .order_by(Income.date.desc())
         .limit(limit)
-        .all()
     )
+    return [
+        {"id": r.id, "amount": r.amount_cents / 100, "source": r.source, "date": r.date}
+        for r in rows
+    ]
 
 
-def get_recent_expenses(user_id: int, limit: int = 5) -> List[Expense]:
-    """Return recent expenses ordered by date desc."""
-    return (
-        Expense.query.filter_by(user_id=user_id)
+def get_recent_expenses(user_id: int, limit: int = 5) -> List[Dict[str, Any]]:
+    """Return recent expenses ordered by date desc, as {id, amount, category, date}."""
+    rows = db.session.execute(
+        select(Expense.id, Expense.amount_cents, Expense.category, Expense.date)
+        .where(Expense.user_id == user_id)
         .order_by(Expense.date.desc())
         .limit(limit)
-        .all()
     )
+    return [
+        {
+            "id": r.id,
+            "amount": r.amount_cents / 100,
+            "category": r.category,
+            "date": r.date,
+        }
+        for r in rows
+    ]
+
+
+@cache.memoize(timeout=_AGGREGATE_CACHE_TIMEOUT)
+def get_recent_transactions(
+    user_id: int, limit: int = 5
+) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """
+    Return (incomes, expenses): the user's `limit` most recent of each.
 
+    Both lists come from one UNION ALL query and hold plain dicts with id,
+    amount, source/category and date.
+    """
+    recent_incomes = (
+        select(
+            literal("income").label("kind"),
+            Income.id,
+            Income.amount_cents,
+            Income.source.label("label"),
+            Income.date,
+        )
+        .where(Income.user_id == user_id)
+        .order_by(Income.date.desc(), Income.id.desc())
+        .limit(limit)
+        .subquery()
+    )
+    recent_expenses = (
+        select(
+            literal("expense").label("kind"),
+            Expense.id,
+            Expense.amount_cents,
+            Expense.category.label("label"),
+            Expense.date,
+        )
+        .where(Expense.user_id == user_id)
+        .order_by(Expense.date.desc(), Expense.id.desc())
+        .limit(limit)
+        .subquery()
+    )
+    # Each branch is wrapped in a subquery so its ORDER BY/LIMIT is valid on SQLite
+    combined = union_all(select(recent_incomes), select(recent_expenses)).subquery()
+    rows = db.session.execute(
+        select(combined).order_by(combined.c.date.desc(), combined.c.id.desc())
+    )
+
+    incomes: List[Dict[str, Any]] = []
+    expenses: List[Dict[str, Any]] = []
+    for r in rows:
+        if r.kind == "income":
+            incomes.append(
+                {
+                    "id": r.id,
+                    "amount": r.amount_cents / 100,
+                    "source": r.label,
+                    "date": r.date,
+                }
+            )
+        else:
+            expenses.append(
+                {
+                    "id": r.id,
+                    "amount": r.amount_cents / 100,
+                    "category": r.label,
+                    "date": r.date,
+                }
+            )
+    return incomes, expenses
 
+
+def list_incomes(
+    user_id: int, limit: int = 50, after: Optional[Tuple[datetime, int]] = None
+) -> List[Dict[str, Any]]:
+    """
+    Return the user's most recent incomes as JSON-ready dicts.
+
+    Selects plain columns instead of ORM objects, so there is no identity-map
+    or per-attribute overhead; the dict shape matches `Income.to_dict`.
+
+    Pages are keyset-based: pass the (date, id) of the last row already seen
+    as `after` to continue from it, which costs the same however deep it is.
+    """
+    stmt = select(
+        Income.id,
+        Income.user_id,
+        Income.amount_cents,
+        Income.source,
+        Income.date,
+        Income.note,
+    ).where(Income.user_id == user_id)
+    if after is not None:
+        stmt = stmt.where(tuple_(Income.date, Income.id) < tuple_(*after))
+    rows = db.session.execute(
+        stmt.order_by(Income.date.desc(), Income.id.desc()).limit(limit)
+    )
+    return [
+        {
+            "id": r.id,
+            "user_id": r.user_id,
+            "amount": r.amount_cents / 100,
+            "source": r.source,
+            "date": r.date,
+            "note": r.note,
+        }
+        for r in rows
+    ]
+
+
+def list_expenses(
+    user_id: int, limit: int = 50, after: Optional[Tuple[datetime, int]] = None
+) -> List[Dict[str, Any]]:
+    """Return the user's most recent expenses as JSON-ready dicts (see list_incomes)."""
+    stmt = select(
+        Expense.id,
+        Expense.user_id,
+        Expense.amount_cents,
+        Expense.category,
+        Expense.date,
+        Expense.note,
+    ).where(Expense.user_id == user_id)
+    if after is not None:
+        stmt = stmt.where(tuple_(Expense.date, Expense.id) < tuple_(*after))
+    rows = db.session.execute(
+        stmt.order_by(Expense.date.desc(), Expense.id.desc()).limit(limit)
+    )
+    return [
+        {
+            "id": r.id,
+            "user_id": r.user_id,
+            "amount": r.amount_cents / 100,
+            "category": r.category,
+            "date": r.date,
+            "note": r.note,
+        }
+        for r in rows
+    ]
+
+
+@cache.memoize(timeout=_AGGREGATE_CACHE_TIMEOUT)
 def expense_by_category(user_id: int) -> List[Dict[str, float]]:
-    """Return list of {category, amount} for the user's expenses."""
-    rows = (
-        db.session.query(
-            Expense.category, db.func.coalesce(db.func.sum(Expense.amount), 0)
-        )
-        .filter(Expense.user_id == user_id)
-        .group_by(Expense.category)
-        .all()
+    """
+    Return list of {category, amount} for the user's expenses.
+
+    Reads the precomputed expense_category_totals rows, so the cost scales with
+    the number of categories rather than the number of expenses.
+    """
+    rows = db.session.execute(
+        select(ExpenseCategoryTotal.category, ExpenseCategoryTotal.total_cents)
+        .where(ExpenseCategoryTotal.user_id == user_id)
+        .order_by(ExpenseCategoryTotal.category)
     )
-    return [{"category": r[0] or "Uncategorized", "amount": float(r[1])} for r in rows]
+    return [
+        {"category": r.category or "Uncategorized", "amount": r.total_cents / 100}
+        for r in rows
+    ]
+
+
+def get_dashboard_context(user_id: int) -> Dict[str, Any]:
+    """
+    Build the dashboard data in three queries: totals, recent rows, categories.
+
+    Everything returned is JSON-serializable, so the same dict backs both the
+    HTML page and the JSON response.
+    """
+    totals = get_totals(user_id)
+    incomes, expenses = get_recent_transactions(user_id)
+    return {
+        "total_income": totals["income"],
+        "total_expense": totals["expense"],
+        "balance": totals["balance"],
+        "incomes": incomes,
+        "expenses": expenses,
+        "categories": expense_by_category(user_id),
+    }
+
+
+def delete_income(user_id: int, item_id: int) -> bool:
+    """
+    Delete one of the user's incomes. Returns False if the user has no such income.
+
+    Ownership is part of the DELETE's WHERE clause: no SELECT beforehand and no
+    gap between checking and deleting.
+    """
+    result = db.session.execute(
+        delete(Income)
+        .where(Income.id == item_id, Income.user_id == user_id)
+        .execution_options(synchronize_session=False)
+    )
+    if not result.rowcount:
+        return False
+    _remember_changed_user(db.session, user_id)
+    db.session.commit()
+    return True
+
+
+def delete_expense(user_id: int, item_id: int) -> bool:
+    """
+    Delete one of the user's expenses (see delete_income).
+
+    The removed row's category and amount are taken out of its category total;
+    PostgreSQL returns them from the DELETE itself.
+    """
+    stmt = (
+        delete(Expense)
+        .where(Expense.id == item_id, Expense.user_id == user_id)
+        .execution_options(synchronize_session=False)
+    )
+    if db.session.get_bind().dialect.name == "postgresql":
+        row = db.session.execute(
+            stmt.returning(Expense.category, Expense.amount_cents)
+        ).first()
+    else:
+        # No RETURNING on SQLite with this SQLAlchemy; read the row first
+        row = db.session.execute(
+            select(Expense.category, Expense.amount_cents).where(
+                Expense.id == item_id, Expense.user_id == user_id
+            )
+        ).first()
+        if row is not None:
+            db.session.execute(stmt)
+    if row is None:
+        return False
+    add_to_category_total(
+        db.session.connection(), user_id, row.category, -row.amount_cents, -1
+    )
+    _remember_changed_user(db.session, user_id)
+    db.session.commit()
+    return True
 
 
 def set_budget(
@@ -150,6 +417,44 @@ def set_budget(
     except Exception:
         return None, "Invalid amount."
 
+    dialect = db.session.get_bind().dialect.name
+    if dialect not in ("postgresql", "sqlite"):
+        return _set_budget_read_modify_write(user_id, month, amt)
+
+    # One INSERT ... ON CONFLICT (user_id, month) DO UPDATE instead of a lookup
+    # followed by an insert or update.
+    b = Budget(user_id=user_id, month=month, amount=amt)
+    stmt = (postgresql if dialect == "postgresql" else sqlite).insert(Budget)
+    stmt = stmt.values(user_id=user_id, month=month, amount_cents=b.amount_cents)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[Budget.user_id, Budget.month],
+        set_={"amount_cents": stmt.excluded.amount_cents},
+    )
+    try:
+        if dialect == "postgresql":
+            b.id = db.session.execute(stmt.returning(Budget.id)).scalar_one()
+        else:
+            # No RETURNING on SQLite with this SQLAlchemy; the lookup is local
+            db.session.execute(stmt)
+            b.id = db.session.execute(
+                select(Budget.id).where(
+                    Budget.user_id == user_id, Budget.month == month
+                )
+            ).scalar_one()
+        db.session.commit()
+    except Exception as exc:  # pragma: no cover
+        db.session.rollback()
+        return None, f"Database error: {exc}"
+
+    # Returned detached: the values are known, no need to re-select the row.
+    make_transient_to_detached(b)
+    return b, None
+
+
+def _set_budget_read_modify_write(
+    user_id: int, month: str, amt: float
+) -> Tuple[Optional[Budget], Optional[str]]:
+    """set_budget for dialects without INSERT ... ON CONFLICT."""
     try:
         b = Budget.query.filter_by(user_id=user_id, month=month).first()
         if not b:
@@ -171,45 +476,97 @@ def get_budget(user_id: int, month: str) -> Optional[Budget]:
     return Budget.query.filter_by(user_id=user_id, month=month).first()
 
 
-def export_transactions_csv(user_id: int) -> str:
-    """
-    Export incomes and expenses as CSV string.
-    Columns: type,date,amount,category/source,note
+class _Echo:
+    """File-like sink whose write() returns the line, so csv rows can be yielded."""
+
+    def write(self, line: str) -> str:
+        return line
+
+
+def export_transactions_csv_stream(user_id: int) -> Iterator[str]:
     """
-    out = StringIO()
-    out.write("type,date,amount,category_or_source,note\n")
+    Yield the user's incomes and expenses as CSV lines, oldest first.
 
-    incomes = Income.query.filter_by(user_id=user_id).order_by(Income.date.asc()).all()
-    expenses = (
-        Expense.query.filter_by(user_id=user_id).order_by(Expense.date.asc()).all()
+    Columns: type,date,amount,category_or_source,note
+    One UNION ALL query ordered by the database, read through a streaming
+    cursor in batches, so memory stays flat however long the history is.
+    """
+    incomes = select(
+        literal("income").label("type"),
+        Income.date,
+        Income.amount_cents,
+        Income.source.label("tag"),
+        Income.note,
+    ).where(Income.user_id == user_id)
+    expenses = select(
+        literal("expense").label("type"),
+        Expense.date,
+        Expense.amount_cents,
+        Expense.category.label("tag"),
+        Expense.note,
+    ).where(Expense.user_id == user_id)
+    combined = union_all(incomes, expenses).subquery()
+    stmt = (
+        select(combined)
+        .order_by(combined.c.date, combined.c.type)
+        .execution_options(stream_results=True, yield_per=1000)
     )
 
-    # Merge by date for a simple chronological export
-    items = []
-    for i in incomes:
-        items.append(
+    writer = csv.writer(_Echo(), lineterminator="\n")
+    yield writer.writerow(("type", "date", "amount", "category_or_source", "note"))
+    for r in db.session.execute(stmt):
+        yield writer.writerow(
             (
-                "income",
-                i.date.isoformat() if i.date else "",
-                float(i.amount),
-                i.source or "",
-                getattr(i, "note", "") or "",
+                r.type,
+                r.date.isoformat() if r.date else "",
+                f"{r.amount_cents / 100:.2f}",
+                r.tag or "",
+                r.note or "",
             )
         )
-    for e in expenses:
-        items.append(
-            (
-                "expense",
-                e.date.isoformat() if e.date else "",
-                float(e.amount),
-                e.category or "",
-                getattr(e, "note", "") or "",
-            )
-        )
-    # sort by date then type
-    items.sort(key=lambda t: (t[1] or "", t[0]))
 
-    for ttype, dt, amt, tag, note in items:
-        out.write(f'{ttype},{dt},{amt:.2f},"{tag}","{note}"\n')
 
-    return out.getvalue()
+# ===== Aggregate cache invalidation =====
+def invalidate_user_cache(user_id: int) -> None:
+    """
+    Drop memoized aggregates for a user.
+
+    ORM writes are handled by the hooks below; call this directly after Core
+    statements (bulk insert/update/delete) that bypass mapper events.
+    """
+    for fn in (get_totals, get_recent_transactions, expense_by_category):
+        cache.delete_memoized(fn, user_id)
+
+
+@event.listens_for(Income, "after_insert")
+@event.listens_for(Income, "after_update")
+@event.listens_for(Income, "after_delete")
+@event.listens_for(Expense, "after_insert")
+@event.listens_for(Expense, "after_update")
+@event.listens_for(Expense, "after_delete")
+def _mark_user_changed(mapper, connection, target) -> None:
+    session = object_session(target)
+    if session is not None:
+        _remember_changed_user(session, target.user_id)
+
+
+@event.listens_for(Income.user_id, "set", active_history=True)
+@event.listens_for(Expense.user_id, "set", active_history=True)
+def _mark_previous_owner(target, value, oldvalue, initiator) -> None:
+    # Moving a row to another user also changes the previous owner's
+    # aggregates; active_history loads the old value even if it was expired.
+    session = object_session(target)
+    if session is not None and isinstance(oldvalue, int) and oldvalue != value:
+        _remember_changed_user(session, oldvalue)
+
+
+def _remember_changed_user(session, user_id: int) -> None:
+    # Only remember the user here; the cache is cleared once the change is
+    # committed so concurrent readers cannot re-cache pre-commit data.
+    session.info.setdefault("finance_changed_users", set()).add(user_id)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_changed_users(session) -> None:
+    for user_id in session.info.pop("finance_changed_users", ()):
+        invalidate_user_cache(user_id)
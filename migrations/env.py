@@ -8,7 +8,6 @@ import logging
 from logging.config import fileConfig
 
 from alembic import context
-from sqlalchemy import engine_from_config, pool
 
 from app import create_app, db
 
@@ -16,15 +15,14 @@ config = context.config
 fileConfig(config.config_file_name)
 logger = logging.getLogger("alembic.env")
 
+# Built once per Alembic run; every step reuses its engine and connection pool
+app = create_app()
+
 
 def get_engine():
-    """Get SQLAlchemy engine from Flask app context."""
-    app = create_app()
-    return engine_from_config(
-        app.config,
-        prefix="SQLALCHEMY_",
-        poolclass=pool.NullPool,
-    )
+    """Get the Flask app's SQLAlchemy engine (configured pool included)."""
+    with app.app_context():
+        return db.engine
 
 
 def run_migrations_offline():
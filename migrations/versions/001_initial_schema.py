@@ -75,7 +75,7 @@ def upgrade():
         sa.Column("created_at", sa.DateTime(), nullable=False),
         sa.ForeignKeyConstraint(["user_id"], ["users.id"]),
         sa.PrimaryKeyConstraint("id"),
-        sa.CheckConstraint("limit > 0", name="budget_limit_positive"),
+        sa.CheckConstraint('"limit" > 0', name="budget_limit_positive"),
     )
     op.create_index("ix_budgets_user_id", "budgets", ["user_id"])
 
@@ -0,0 +1,57 @@
+"""Replace the users.email index with a unique index on lower(email).
+
+Lookups compare on lower(email), and the functional index also rejects
+case-variant duplicates that the plain unique constraint allowed.
+
+Databases reach this revision in two shapes: 001 leaves a plain
+ix_users_email index plus unique constraints on email (the named
+unique_user_email and an unnamed one from unique=True), while databases built
+with db.create_all() and stamped have a unique ix_users_email index only. The
+upgrade reflects what is there and drops that.
+
+Revision ID: 002_users_email_lower_index
+Revises: 001_initial_schema
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "002_users_email_lower_index"
+down_revision = "001_initial_schema"
+branch_labels = None
+depends_on = None
+
+
+# Gives SQLite's unnamed unique constraints a name batch mode can drop them by
+_NAMING_CONVENTION = {"uq": "uq_%(table_name)s_%(column_0_name)s"}
+
+
+def upgrade():
+    """Swap the plain email index/constraint for a lower(email) unique index."""
+    inspector = sa.inspect(op.get_bind())
+    if any(ix["name"] == "ix_users_email" for ix in inspector.get_indexes("users")):
+        op.drop_index("ix_users_email", table_name="users")
+
+    email_uniques = [
+        uc["name"]
+        for uc in inspector.get_unique_constraints("users")
+        if uc["column_names"] == ["email"]
+    ]
+    if email_uniques:
+        with op.batch_alter_table(
+            "users", naming_convention=_NAMING_CONVENTION
+        ) as batch_op:
+            for name in email_uniques:
+                batch_op.drop_constraint(name or "uq_users_email", type_="unique")
+
+    op.create_index(
+        "ix_users_email_lower", "users", [sa.text("lower(email)")], unique=True
+    )
+
+
+def downgrade():
+    """Restore the plain email unique constraint and index."""
+    op.drop_index("ix_users_email_lower", table_name="users")
+    with op.batch_alter_table("users") as batch_op:
+        batch_op.create_unique_constraint("unique_user_email", ["email"])
+    op.create_index("ix_users_email", "users", ["email"])
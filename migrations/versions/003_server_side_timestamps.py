@@ -0,0 +1,47 @@
+"""Let the database stamp created_at/date columns on insert.
+
+Revision ID: 003_server_side_timestamps
+Revises: 002_users_email_lower_index
+"""
+
+import sqlalchemy as sa
+from alembic import op
+from finflow.common.sql import utcnow
+
+revision = "003_server_side_timestamps"
+down_revision = "002_users_email_lower_index"
+branch_labels = None
+depends_on = None
+
+_COLUMNS = (
+    ("users", "created_at"),
+    ("incomes", "date"),
+    ("expenses", "date"),
+)
+
+
+def _set_server_defaults(server_default):
+    # SQLite batch mode rebuilds the table and cannot reflect 002's
+    # lower(email) expression index, so take it off users and put it back.
+    op.drop_index("ix_users_email_lower", table_name="users")
+    for table, column in _COLUMNS:
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.alter_column(
+                column,
+                existing_type=sa.DateTime(),
+                existing_nullable=False,
+                server_default=server_default,
+            )
+    op.create_index(
+        "ix_users_email_lower", "users", [sa.text("lower(email)")], unique=True
+    )
+
+
+def upgrade():
+    """Add UTC server defaults."""
+    _set_server_defaults(utcnow())
+
+
+def downgrade():
+    """Drop the server defaults again."""
+    _set_server_defaults(None)
@@ -0,0 +1,89 @@
+"""Store money amounts as integer cents.
+
+Replaces the Numeric(12, 2) amount column on incomes, expenses and budgets
+with a BIGINT `amount_cents` column, converting existing values.
+
+001 names the budgets column `limit` (checked by budget_limit_positive), while
+databases built with db.create_all() and stamped have `amount` (checked by
+budget_amount_nonnegative); the upgrade converts whichever is present.
+
+Revision ID: 004_amounts_in_cents
+Revises: 003_server_side_timestamps
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "004_amounts_in_cents"
+down_revision = "003_server_side_timestamps"
+branch_labels = None
+depends_on = None
+
+# table -> (column, check name, check SQL) as 001 created it, and the new check
+_TABLES = (
+    (
+        "incomes",
+        ("amount", "income_amount_nonnegative", "amount >= 0"),
+        "income_amount_nonnegative",
+    ),
+    (
+        "expenses",
+        ("amount", "expense_amount_nonnegative", "amount >= 0"),
+        "expense_amount_nonnegative",
+    ),
+    (
+        "budgets",
+        ("limit", "budget_limit_positive", '"limit" > 0'),
+        "budget_amount_nonnegative",
+    ),
+)
+_OLD_CHECKS = {
+    "income_amount_nonnegative",
+    "expense_amount_nonnegative",
+    "budget_amount_nonnegative",
+    "budget_limit_positive",
+}
+
+
+def upgrade():
+    """Add amount_cents, backfill it from the old amount column, then drop that."""
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    quote = bind.dialect.identifier_preparer.quote
+    for table, _old, check_name in _TABLES:
+        columns = {c["name"] for c in inspector.get_columns(table)}
+        old_column = "amount" if "amount" in columns else "limit"
+        old_checks = [
+            ck["name"]
+            for ck in inspector.get_check_constraints(table)
+            if ck["name"] in _OLD_CHECKS
+        ]
+
+        op.add_column(table, sa.Column("amount_cents", sa.BigInteger(), nullable=True))
+        op.execute(
+            f"UPDATE {table} SET amount_cents = "
+            f"CAST(ROUND({quote(old_column)} * 100) AS BIGINT)"
+        )
+        with op.batch_alter_table(table) as batch_op:
+            for name in old_checks:
+                batch_op.drop_constraint(name, type_="check")
+            batch_op.drop_column(old_column)
+            batch_op.alter_column(
+                "amount_cents", existing_type=sa.BigInteger(), nullable=False
+            )
+            batch_op.create_check_constraint(check_name, "amount_cents >= 0")
+
+
+def downgrade():
+    """Restore the Numeric amount columns (budgets.limit) as 001 defines them."""
+    quote = op.get_bind().dialect.identifier_preparer.quote
+    for table, (old_column, old_check, old_check_sql), check_name in _TABLES:
+        op.add_column(table, sa.Column(old_column, sa.Numeric(12, 2), nullable=True))
+        op.execute(f"UPDATE {table} SET {quote(old_column)} = amount_cents / 100.0")
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.drop_constraint(check_name, type_="check")
+            batch_op.drop_column("amount_cents")
+            batch_op.alter_column(
+                old_column, existing_type=sa.Numeric(12, 2), nullable=False
+            )
+            batch_op.create_check_constraint(old_check, old_check_sql)
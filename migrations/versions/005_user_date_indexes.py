@@ -0,0 +1,40 @@
+"""Index incomes/expenses by (user_id, date DESC) and expenses by category.
+
+The list/recent queries filter on user_id and order by date descending, so a
+composite index serves them without a sort; it also covers user_id-only
+lookups, making the single-column user_id indexes redundant. The category
+index backs the per-user GROUP BY category on the dashboard.
+
+Revision ID: 005_user_date_indexes
+Revises: 004_amounts_in_cents
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "005_user_date_indexes"
+down_revision = "004_amounts_in_cents"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    """Replace user_id indexes with composite (user_id, date DESC) indexes."""
+    op.create_index(
+        "ix_incomes_user_date", "incomes", ["user_id", sa.text("date DESC")]
+    )
+    op.create_index(
+        "ix_expenses_user_date", "expenses", ["user_id", sa.text("date DESC")]
+    )
+    op.create_index("ix_expenses_user_category", "expenses", ["user_id", "category"])
+    op.drop_index("ix_incomes_user_id", table_name="incomes")
+    op.drop_index("ix_expenses_user_id", table_name="expenses")
+
+
+def downgrade():
+    """Restore the single-column user_id indexes."""
+    op.create_index("ix_expenses_user_id", "expenses", ["user_id"])
+    op.create_index("ix_incomes_user_id", "incomes", ["user_id"])
+    op.drop_index("ix_expenses_user_category", table_name="expenses")
+    op.drop_index("ix_expenses_user_date", table_name="expenses")
+    op.drop_index("ix_incomes_user_date", table_name="incomes")
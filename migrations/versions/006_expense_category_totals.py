@@ -0,0 +1,41 @@
+"""Add the expense_category_totals summary table.
+
+Holds each user's running expense total and count per category so the
+dashboard and reports read O(categories) rows instead of aggregating every
+expense; a row is dropped with its category's last expense. It is kept
+current by mapper events on Expense; this migration backfills it.
+
+Revision ID: 006_expense_category_totals
+Revises: 005_user_date_indexes
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "006_expense_category_totals"
+down_revision = "005_user_date_indexes"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    """Create expense_category_totals and fill it from existing expenses."""
+    op.create_table(
+        "expense_category_totals",
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id"), nullable=False),
+        sa.Column("category", sa.String(length=50), nullable=False),
+        sa.Column("total_cents", sa.BigInteger(), nullable=False),
+        sa.Column("expense_count", sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint("user_id", "category"),
+    )
+    op.execute(
+        "INSERT INTO expense_category_totals "
+        "(user_id, category, total_cents, expense_count) "
+        "SELECT user_id, category, SUM(amount_cents), COUNT(*) FROM expenses "
+        "GROUP BY user_id, category"
+    )
+
+
+def downgrade():
+    """Drop expense_category_totals."""
+    op.drop_table("expense_category_totals")
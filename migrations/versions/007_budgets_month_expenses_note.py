@@ -0,0 +1,92 @@
+"""Bring the 001 budgets and expenses tables in line with the models.
+
+001 created per-category budgets (category, limit, created_at) and an
+expenses.description column, while the models have one budget per month
+(month, amount) and expenses.note. Budgets get a YYYY-MM month taken from
+created_at, with each user's category budgets for a month summed into every
+row of that month (008 then keeps one row per user and month); category and
+created_at are dropped. expenses.description becomes note; the rename is a
+plain ALTER rather than a batch rebuild, which would lose 005's DESC index
+ordering on SQLite.
+
+Databases built with db.create_all() already have month and note and are left
+as they are.
+
+Revision ID: 007_budgets_month_expenses_note
+Revises: 006_expense_category_totals
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "007_budgets_month_expenses_note"
+down_revision = "006_expense_category_totals"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    """Add budgets.month from created_at, drop category/created_at, rename note."""
+    inspector = sa.inspect(op.get_bind())
+
+    budget_columns = {c["name"] for c in inspector.get_columns("budgets")}
+    if "month" not in budget_columns:
+        op.add_column("budgets", sa.Column("month", sa.String(7), nullable=True))
+        op.execute(
+            "UPDATE budgets SET month = substr(CAST(created_at AS VARCHAR(32)), 1, 7)"
+        )
+        op.execute(
+            "UPDATE budgets SET amount_cents = (SELECT SUM(b.amount_cents) "
+            "FROM budgets b WHERE b.user_id = budgets.user_id "
+            "AND b.month = budgets.month)"
+        )
+        with op.batch_alter_table("budgets") as batch_op:
+            batch_op.alter_column(
+                "month",
+                existing_type=sa.String(7),
+                nullable=False,
+                comment="Format: YYYY-MM",
+            )
+            batch_op.drop_column("category")
+            batch_op.drop_column("created_at")
+
+    expense_columns = {c["name"] for c in inspector.get_columns("expenses")}
+    if "description" in expense_columns:
+        op.alter_column(
+            "expenses",
+            "description",
+            new_column_name="note",
+            existing_type=sa.String(255),
+            existing_nullable=True,
+        )
+
+
+def downgrade():
+    """Restore 001's budgets category/created_at and expenses.description."""
+    op.alter_column(
+        "expenses",
+        "note",
+        new_column_name="description",
+        existing_type=sa.String(255),
+        existing_nullable=True,
+    )
+
+    op.add_column("budgets", sa.Column("category", sa.String(50), nullable=True))
+    op.add_column("budgets", sa.Column("created_at", sa.DateTime(), nullable=True))
+    first_of_month = sa.column("month", sa.String) + "-01"
+    if op.get_bind().dialect.name != "sqlite":
+        first_of_month = sa.cast(first_of_month, sa.DateTime())
+    op.execute(
+        sa.table(
+            "budgets",
+            sa.column("category"),
+            sa.column("created_at"),
+            sa.column("month"),
+        )
+        .update()
+        .values(category="General", created_at=first_of_month)
+    )
+    with op.batch_alter_table("budgets") as batch_op:
+        batch_op.alter_column("category", existing_type=sa.String(50), nullable=False)
+        batch_op.alter_column("created_at", existing_type=sa.DateTime(), nullable=False)
+        batch_op.drop_column("month")
@@ -0,0 +1,32 @@
+"""Make (user_id, month) unique on budgets.
+
+set_budget upserts with INSERT ... ON CONFLICT (user_id, month), which needs
+a unique key to conflict on. Any duplicate rows left by the old
+read-then-write path are collapsed to the most recently created one first.
+
+Revision ID: 008_budgets_user_month_unique
+Revises: 007_budgets_month_expenses_note
+"""
+
+from alembic import op
+
+revision = "008_budgets_user_month_unique"
+down_revision = "007_budgets_month_expenses_note"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    """Drop duplicate budgets, then add the unique constraint."""
+    op.execute(
+        "DELETE FROM budgets WHERE id NOT IN "
+        "(SELECT MAX(id) FROM budgets GROUP BY user_id, month)"
+    )
+    with op.batch_alter_table("budgets") as batch_op:
+        batch_op.create_unique_constraint("uq_budgets_user_month", ["user_id", "month"])
+
+
+def downgrade():
+    """Drop the (user_id, month) unique constraint."""
+    with op.batch_alter_table("budgets") as batch_op:
+        batch_op.drop_constraint("uq_budgets_user_month", type_="unique")
@@ -2,37 +2,113 @@
 Pytest configuration and fixtures for PinkLedger tests.
 
 Provides:
-- Flask app fixture for testing
-- Database fixture (in-memory SQLite)
+- Flask app fixture for testing (one app and schema per test session)
+- Opt-in per-test database isolation (SAVEPOINT rolled back after each test)
+- Low-cost password hashing for the whole run
 - Client fixture for making requests
 - User fixtures for authentication tests
+- Stub password check for tests that only need a logged-in session
+- Bulk seeding of finance rows
 """
 
+import hmac
+
 import pytest
-from app import create_app, db
-from auth.model import User
+from finflow.app import cache, create_app, db
+from finflow.auth import model as auth_model
+from finflow.auth.model import User
+from finflow.finance.models import Expense, Income, add_to_category_total
+from sqlalchemy import event, insert
+from werkzeug.security import generate_password_hash
 
 
-@pytest.fixture
+# Production PBKDF2 cost is irrelevant to what these tests check.
+_TEST_PASSWORD_HASH_METHOD = "pbkdf2:sha256:1000"
+TEST_USER_PASSWORD = "secure_password_123"
+
+
+@pytest.fixture(scope="session", autouse=True)
+def fast_password_hashing():
+    """Hash passwords with a low PBKDF2 iteration count for the whole run."""
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr(auth_model, "PASSWORD_HASH_METHOD", _TEST_PASSWORD_HASH_METHOD)
+        yield
+
+
+@pytest.fixture(scope="session")
 def app():
-    """Create and configure a Flask app instance for testing."""
+    """Create the Flask app and its in-memory schema once for the whole run."""
     app = create_app(
         test_config={
             "TESTING": True,
             "SQLALCHEMY_DATABASE_URI": "sqlite:///:memory:",
             "WTF_CSRF_ENABLED": False,
+            # Exercise the aggregate cache and its invalidation
+            "CACHE_TYPE": "SimpleCache",
         }
     )
 
     with app.app_context():
+        engine = db.engine
+
+        # pysqlite defers BEGIN and so breaks SAVEPOINT; let SQLAlchemy emit it.
+        @event.listens_for(engine, "connect")
+        def _disable_pysqlite_begin(dbapi_connection, connection_record):
+            dbapi_connection.isolation_level = None
+
+        @event.listens_for(engine, "begin")
+        def _emit_begin(connection):
+            connection.exec_driver_sql("BEGIN")
+
         db.create_all()
-        yield app
-        db.session.remove()
+
+    yield app
+
+    with app.app_context():
         db.drop_all()
 
 
 @pytest.fixture
-def client(app):
+def db_session(app):
+    """
+    Run each test in an app context inside an outer transaction.
+
+    The session works in a SAVEPOINT that is re-opened whenever the code under
+    test commits or rolls back; the outer transaction is rolled back at
+    teardown, so no test sees another's rows.
+
+    Not autouse: test_user and client request it, and tests that never touch
+    the app or database skip the connection and SAVEPOINT entirely.
+    """
+    with app.app_context():
+        engines = db.engines
+        engine = engines[None]
+        connection = engine.connect()
+        transaction = connection.begin()
+        nested = connection.begin_nested()
+        # Flask-SQLAlchemy resolves its bind from this mapping, so every
+        # session in the test (including per-request ones) joins `connection`.
+        engines[None] = connection
+
+        def _restart_savepoint(session, trans):
+            nonlocal nested
+            if not nested.is_active:
+                nested = connection.begin_nested()
+
+        event.listen(db.session, "after_transaction_end", _restart_savepoint)
+        try:
+            yield db.session
+        finally:
+            event.remove(db.session, "after_transaction_end", _restart_savepoint)
+            db.session.remove()
+            transaction.rollback()
+            connection.close()
+            engines[None] = engine
+            cache.clear()
+
+
+@pytest.fixture
+def client(app, db_session):
     """Flask test client for making HTTP requests."""
     return app.test_client()
 
@@ -43,21 +119,79 @@ def runner(app):
     return app.test_cli_runner()
 
 
+@pytest.fixture(scope="session")
+def test_user_password_hash():
+    """Hash of TEST_USER_PASSWORD, computed once instead of per test_user."""
+    return generate_password_hash(
+        TEST_USER_PASSWORD, method=_TEST_PASSWORD_HASH_METHOD, salt_length=16
+    )
+
+
 @pytest.fixture
-def test_user(app):
+def test_user(db_session, test_user_password_hash):
     """Create a test user in the database."""
-    user = User(name="Test User", email="test@example.com")
-    user.set_password("secure_password_123")
+    user = User(
+        name="Test User",
+        email="test@example.com",
+        password_hash=test_user_password_hash,
+    )
     db.session.add(user)
     db.session.commit()
     return user
 
 
 @pytest.fixture
-def authenticated_client(client, test_user):
+def bulk_create(db_session):
+    """
+    Return a helper inserting many rows of a model in one executemany.
+
+    Core INSERTs skip the ORM mapper events, so rows seeded this way do not
+    update ExpenseCategoryTotal.
+    """
+
+    def _bulk_create(model, rows):
+        db_session.execute(insert(model.__table__), rows)
+        db_session.flush()
+
+    return _bulk_create
+
+
+@pytest.fixture
+def seeded_transactions(test_user, bulk_create, db_session):
+    """One income and one expense owned by test_user (ids 1)."""
+    bulk_create(
+        Income, [{"user_id": test_user.id, "amount_cents": 100000, "source": "Salary"}]
+    )
+    bulk_create(
+        Expense, [{"user_id": test_user.id, "amount_cents": 5000, "category": "Food"}]
+    )
+    # The Core insert skips the mapper events that keep this total
+    add_to_category_total(db_session.connection(), test_user.id, "Food", 5000, 1)
+
+
+@pytest.fixture
+def fast_check(monkeypatch):
+    """
+    Verify passwords by plain comparison with TEST_USER_PASSWORD.
+
+    For tests about routing and sessions rather than hashing; login goes
+    through User.verify_password, which check_password also delegates to.
+    """
+
+    def _verify(password_hash, password):
+        return bool(password_hash) and hmac.compare_digest(password, TEST_USER_PASSWORD)
+
+    monkeypatch.setattr(User, "verify_password", staticmethod(_verify))
+
+
+@pytest.fixture
+def authenticated_client(client, test_user, fast_check):
     """Client with authenticated user session."""
-    client.post(
-        "/login",
-        data={"email": "test@example.com", "password": "secure_password_123"},
+    response = client.post(
+        "/auth/login",
+        data={"email": "test@example.com", "password": TEST_USER_PASSWORD},
     )
+    # A failed login re-renders the form with 200; only success redirects.
+    assert response.status_code == 302
+    assert response.headers["Location"] == "/finance/dashboard"
     return client
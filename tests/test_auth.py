@@ -9,26 +9,28 @@ Tests cover:
 - Login persistence
 """
 
-from auth.model import User
+from datetime import datetime
+
+import pytest
+from finflow.auth.model import User
+from finflow.auth.service import register_user
 
 
 class TestUserModel:
     """Test User model and password handling."""
 
-    def test_set_password(self, app):
+    def test_set_password(self):
         """Test password hashing."""
-        with app.app_context():
-            user = User(name="John", email="john@example.com")
-            user.set_password("secure123")
-            assert user.password_hash != "secure123"
-            assert user.check_password("secure123")
+        user = User(name="John", email="john@example.com")
+        user.set_password("secure123")
+        assert user.password_hash != "secure123"
+        assert user.check_password("secure123")
 
-    def test_check_password_fails(self, app):
+    def test_check_password_fails(self):
         """Test password validation with wrong password."""
-        with app.app_context():
-            user = User(name="Jane", email="jane@example.com")
-            user.set_password("correct")
-            assert not user.check_password("wrong")
+        user = User(name="Jane", email="jane@example.com")
+        user.set_password("correct")
+        assert not user.check_password("wrong")
 
     def test_user_to_dict(self, test_user):
         """Test user serialization excludes password."""
@@ -37,33 +39,61 @@ class TestUserModel:
         assert data["email"] == "test@example.com"
 
 
+class TestRegisterUser:
+    """Test the register_user service."""
+
+    def test_register_returns_persisted_user(self, db_session):
+        """Test the returned user has its id and server-stamped created_at."""
+        user, error = register_user("New User", "New@Example.com", "pass123")
+        assert error is None
+        assert user.id is not None
+        assert user.email == "new@example.com"
+        assert isinstance(user.created_at, datetime)
+        assert db_session.get(User, user.id) is user
+
+    @pytest.mark.parametrize(
+        "existing, email",
+        [("a@x.com", "a@x.com"), ("a@x.com", "A@X.com"), ("A@X.com", "a@x.com")],
+    )
+    def test_register_duplicate_email(self, db_session, existing, email):
+        """Test an existing email, in any case, is rejected by lower(email)."""
+        # Stored as given, as rows written before emails were lowercased are
+        db_session.add(User(name="First", email=existing, password_hash="x"))
+        db_session.commit()
+        user, error = register_user("Second", email, "pass456")
+        assert user is None
+        assert error == "A user with this email already exists."
+        assert db_session.query(User).count() == 1
+
+
 class TestAuthRoutes:
     """Test authentication endpoints."""
 
-    def test_register_get(self, client):
-        """Test GET /register returns registration form."""
-        response = client.get("/register")
+    @pytest.mark.parametrize("form", ["register", "login"])
+    def test_form_get(self, client, form):
+        """Test GET /auth/register and /auth/login return their forms."""
+        response = client.get(f"/auth/{form}")
         assert response.status_code == 200
-        assert b"register" in response.data.lower()
+        assert form.encode() in response.data.lower()
 
     def test_register_post_success(self, client):
         """Test successful user registration."""
         response = client.post(
-            "/register",
+            "/auth/register",
             data={
                 "name": "New User",
                 "email": "newuser@example.com",
                 "password": "pass123",
                 "confirm_password": "pass123",
             },
-            follow_redirects=True,
         )
-        assert response.status_code == 200
+        assert response.status_code == 302
+        assert response.headers["Location"] == "/finance/dashboard"
 
     def test_register_post_mismatch_password(self, client):
         """Test registration with mismatched passwords."""
         response = client.post(
-            "/register",
+            "/auth/register",
             data={
                 "name": "User",
                 "email": "user@example.com",
@@ -73,16 +103,10 @@ class TestAuthRoutes:
         )
         assert response.status_code == 200
 
-    def test_login_get(self, client):
-        """Test GET /login returns login form."""
-        response = client.get("/login")
-        assert response.status_code == 200
-        assert b"login" in response.data.lower()
-
-    def test_login_success(self, client, test_user):
+    def test_login_success(self, client, test_user, fast_check):
         """Test successful login."""
         response = client.post(
-            "/login",
+            "/auth/login",
             data={"email": "test@example.com", "password": "secure_password_123"},
             follow_redirects=True,
         )
@@ -91,7 +115,7 @@ class TestAuthRoutes:
     def test_login_invalid_email(self, client):
         """Test login with non-existent email."""
         response = client.post(
-            "/login",
+            "/auth/login",
             data={"email": "nonexistent@example.com", "password": "anypassword"},
         )
         assert response.status_code == 200
@@ -99,17 +123,27 @@ class TestAuthRoutes:
     def test_login_invalid_password(self, client, test_user):
         """Test login with wrong password."""
         response = client.post(
-            "/login",
+            "/auth/login",
             data={"email": "test@example.com", "password": "wrongpassword"},
         )
         assert response.status_code == 200
 
     def test_logout(self, authenticated_client):
         """Test logout functionality."""
-        response = authenticated_client.get("/logout", follow_redirects=True)
-        assert response.status_code == 200
+        response = authenticated_client.get("/auth/logout")
+        assert response.status_code == 302
+        assert response.headers["Location"] == "/auth/login"
 
     def test_authenticated_user_redirect(self, authenticated_client):
         """Test authenticated user redirect from login."""
-        response = authenticated_client.get("/login")
+        response = authenticated_client.get("/auth/login")
+        assert response.status_code == 302
+        assert response.headers["Location"] == "/finance/dashboard"
+
+    def test_malformed_session_user_id(self, client):
+        """Test a non-decimal user id in the session is treated as anonymous."""
+        with client.session_transaction() as session:
+            # "²" passes str.isdigit() but int() rejects it
+            session["_user_id"] = "²"
+        response = client.get("/finance/dashboard")
         assert response.status_code == 302
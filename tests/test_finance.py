@@ -9,77 +9,117 @@ Tests cover:
 - Report generation
 """
 
+from datetime import datetime
 from decimal import Decimal
-from finance.models import Income, Expense, Budget
+
+import pytest
+from finflow.finance.models import Budget, Expense, ExpenseCategoryTotal, Income
+from sqlalchemy import select
 
 
 class TestIncomeModel:
     """Test Income model."""
 
-    def test_income_creation(self, app, test_user):
+    def test_income_creation(self, test_user):
         """Test creating an income record."""
-        with app.app_context():
-            income = Income(
-                user_id=test_user.id,
-                amount=Decimal("1000.00"),
-                source="Salary",
-            )
-            assert income.amount == Decimal("1000.00")
-            assert income.source == "Salary"
+        income = Income(
+            user_id=test_user.id,
+            amount=Decimal("1000.00"),
+            source="Salary",
+        )
+        assert income.amount == Decimal("1000.00")
+        assert income.source == "Salary"
 
-    def test_income_to_dict(self, app, test_user):
+    def test_income_to_dict(self, test_user):
         """Test income serialization."""
-        with app.app_context():
-            income = Income(
-                user_id=test_user.id,
-                amount=Decimal("500.00"),
-                source="Freelance",
-            )
-            data = income.to_dict()
-            assert data["amount"] == 500.0
-            assert data["source"] == "Freelance"
+        income = Income(
+            user_id=test_user.id,
+            amount=Decimal("500.00"),
+            source="Freelance",
+        )
+        data = income.to_dict()
+        assert data["amount"] == 500.0
+        assert data["source"] == "Freelance"
 
 
 class TestExpenseModel:
     """Test Expense model."""
 
-    def test_expense_creation(self, app, test_user):
+    def test_expense_creation(self, test_user):
         """Test creating an expense record."""
-        with app.app_context():
-            expense = Expense(
-                user_id=test_user.id,
-                amount=Decimal("50.00"),
-                category="Food",
-            )
-            assert expense.amount == Decimal("50.00")
-            assert expense.category == "Food"
+        expense = Expense(
+            user_id=test_user.id,
+            amount=Decimal("50.00"),
+            category="Food",
+        )
+        assert expense.amount == Decimal("50.00")
+        assert expense.category == "Food"
 
-    def test_expense_to_dict(self, app, test_user):
+    def test_expense_to_dict(self, test_user):
         """Test expense serialization."""
-        with app.app_context():
-            expense = Expense(
-                user_id=test_user.id,
-                amount=Decimal("100.00"),
-                category="Shopping",
-            )
-            data = expense.to_dict()
-            assert data["amount"] == 100.0
-            assert data["category"] == "Shopping"
+        expense = Expense(
+            user_id=test_user.id,
+            amount=Decimal("100.00"),
+            category="Shopping",
+        )
+        data = expense.to_dict()
+        assert data["amount"] == 100.0
+        assert data["category"] == "Shopping"
+
+
+class TestExpenseCategoryTotals:
+    """Test the mapper events that keep ExpenseCategoryTotal in step."""
+
+    @staticmethod
+    def _totals(user_id):
+        rows = ExpenseCategoryTotal.query.filter_by(user_id=user_id)
+        return {row.category: row.total_cents for row in rows}
+
+    def test_insert_update_delete(self, test_user, db_session):
+        """Test totals follow an expense through its lifecycle."""
+        expense = Expense(user_id=test_user.id, amount_cents=2500, category="Food")
+        db_session.add(expense)
+        db_session.add(
+            Expense(user_id=test_user.id, amount_cents=1000, category="Food")
+        )
+        db_session.commit()
+        assert self._totals(test_user.id) == {"Food": 3500}
+
+        expense.category = "Travel"
+        db_session.commit()
+        assert self._totals(test_user.id) == {"Food": 1000, "Travel": 2500}
+
+        expense.amount_cents = 4000
+        db_session.commit()
+        assert self._totals(test_user.id) == {"Food": 1000, "Travel": 4000}
+
+        db_session.delete(expense)
+        db_session.commit()
+        assert self._totals(test_user.id) == {"Food": 1000}
+
+    def test_zero_sum_category_is_listed(self, test_user, db_session):
+        """Test a category whose expenses total 0 still appears, as GROUP BY did."""
+        from finflow.finance.service import expense_by_category
+
+        db_session.add(Expense(user_id=test_user.id, amount_cents=0, category="Gift"))
+        db_session.commit()
+        assert expense_by_category(test_user.id) == [
+            {"category": "Gift", "amount": 0.0}
+        ]
 
 
 class TestBudgetModel:
     """Test Budget model."""
 
-    def test_budget_creation(self, app, test_user):
+    def test_budget_creation(self, test_user):
         """Test creating a budget record."""
-        with app.app_context():
-            budget = Budget(
-                user_id=test_user.id,
-                category="Food",
-                limit=Decimal("300.00"),
-            )
-            assert budget.limit == Decimal("300.00")
-            assert budget.category == "Food"
+        budget = Budget(
+            user_id=test_user.id,
+            month="2024-01",
+            amount=Decimal("300.00"),
+        )
+        assert budget.amount == Decimal("300.00")
+        assert budget.month == "2024-01"
 
 
 class TestFinanceRoutes:
@@ -87,84 +127,179 @@ class TestFinanceRoutes:
 
     def test_dashboard_requires_login(self, client):
         """Test dashboard redirects unauthenticated users."""
-        response = client.get("/dashboard")
+        response = client.get("/finance/dashboard")
         assert response.status_code == 302
 
-    def test_dashboard_authenticated(self, authenticated_client):
-        """Test authenticated user can access dashboard."""
-        response = authenticated_client.get("/dashboard")
-        assert response.status_code == 200
-
-    def test_income_page_authenticated(self, authenticated_client):
-        """Test income page is accessible."""
-        response = authenticated_client.get("/income")
-        assert response.status_code == 200
-
-    def test_expense_page_authenticated(self, authenticated_client):
-        """Test expense page is accessible."""
-        response = authenticated_client.get("/expense")
-        assert response.status_code == 200
-
-    def test_budget_page_authenticated(self, authenticated_client):
-        """Test budget page is accessible."""
-        response = authenticated_client.get("/budget")
-        assert response.status_code == 200
-
-    def test_reports_page_authenticated(self, authenticated_client):
-        """Test reports page is accessible."""
-        response = authenticated_client.get("/reports")
+    @pytest.mark.parametrize(
+        "path",
+        [
+            "/finance/dashboard",
+            "/finance/income/list",
+            "/finance/expense/list",
+            "/finance/budget",
+            "/finance/reports",
+        ],
+    )
+    def test_pages_authenticated(self, authenticated_client, path):
+        """Test authenticated user can access each finance page."""
+        response = authenticated_client.get(path)
         assert response.status_code == 200
 
     def test_add_income(self, authenticated_client):
         """Test adding income."""
         response = authenticated_client.post(
-            "/add-income",
+            "/finance/income",
             data={"amount": "500", "source": "Freelance", "date": "2024-01-15"},
-            follow_redirects=True,
         )
-        assert response.status_code == 200
+        assert response.status_code == 302
 
     def test_add_expense(self, authenticated_client):
         """Test adding expense."""
         response = authenticated_client.post(
-            "/add-expense",
+            "/finance/expense",
             data={"amount": "50", "category": "Food", "date": "2024-01-15"},
-            follow_redirects=True,
         )
-        assert response.status_code == 200
+        assert response.status_code == 302
 
-    def test_delete_income(self, authenticated_client):
+    def test_delete_income(self, authenticated_client, seeded_transactions, db_session):
         """Test deleting an income record."""
-        response = authenticated_client.get("/del-income/1", follow_redirects=True)
+        response = authenticated_client.delete("/finance/income/1")
+        assert response.status_code == 200
+        assert response.get_json() == {"deleted": True}
+        assert db_session.get(Income, 1) is None
+
+    def test_delete_expense(
+        self, authenticated_client, test_user, seeded_transactions, db_session
+    ):
+        """Test deleting an expense record and its category total."""
+        totals = select(
+            ExpenseCategoryTotal.category, ExpenseCategoryTotal.total_cents
+        ).where(ExpenseCategoryTotal.user_id == test_user.id)
+        assert db_session.execute(totals).all() == [("Food", 5000)]
+
+        response = authenticated_client.delete("/finance/expense/1")
         assert response.status_code == 200
+        assert response.get_json() == {"deleted": True}
+        assert db_session.get(Expense, 1) is None
+        assert db_session.execute(totals).all() == []
+
+    @pytest.mark.parametrize("kind", ["income", "expense"])
+    def test_delete_missing(self, authenticated_client, kind):
+        """Test deleting a record that does not exist returns 404."""
+        response = authenticated_client.delete(f"/finance/{kind}/999")
+        assert response.status_code == 404
+        assert response.get_json() == {"deleted": False}
+
+    @pytest.mark.parametrize(
+        "kind, fields",
+        [("income", {"source": "Salary"}), ("expense", {"category": "Food"})],
+    )
+    def test_list_pages(self, app, authenticated_client, monkeypatch, kind, fields):
+        """Test following the Link header visits every row exactly once."""
+        monkeypatch.setitem(app.config, "DEFAULT_PAGE_SIZE", 2)
+        # No date posted, so every row is stamped by the server default
+        for amount in range(1, 6):
+            authenticated_client.post(
+                f"/finance/{kind}", data={"amount": str(amount), **fields}
+            )
+
+        seen = []
+        url = f"/finance/{kind}"
+        for _ in range(5):
+            response = authenticated_client.get(url)
+            assert response.status_code == 200
+            seen += [item["id"] for item in response.get_json()]
+            link = response.headers.get("Link")
+            if link is None:
+                break
+            url = link[1 : link.index(">")]
+        else:
+            pytest.fail("pagination did not end")
+
+        assert sorted(seen) == [1, 2, 3, 4, 5]
+
+    def test_set_budget_twice_updates_in_place(self, authenticated_client, test_user):
+        """Test re-posting a month's budget updates the same row."""
+        first = authenticated_client.post(
+            "/finance/budget", json={"month": "2024-01", "amount": "300"}
+        )
+        second = authenticated_client.post(
+            "/finance/budget", json={"month": "2024-01", "amount": "450.50"}
+        )
+
+        assert first.status_code == second.status_code == 200
+        budget = second.get_json()["budget"]
+        assert budget["id"] == first.get_json()["budget"]["id"]
+        assert budget["amount"] == 450.5
+        rows = Budget.query.filter_by(user_id=test_user.id).all()
+        assert [(row.id, row.month, row.amount_cents) for row in rows] == [
+            (budget["id"], "2024-01", 45050)
+        ]
+
+    def test_export_csv(self, authenticated_client, test_user, db_session):
+        """Test the CSV export's header, date ordering and quoting."""
+        db_session.add_all(
+            [
+                Income(
+                    user_id=test_user.id,
+                    amount_cents=150000,
+                    source='Acme, "Inc"',
+                    date=datetime(2024, 2, 1),
+                ),
+                Expense(
+                    user_id=test_user.id,
+                    amount_cents=1250,
+                    category="Food",
+                    date=datetime(2024, 1, 15),
+                    note="lunch",
+                ),
+            ]
+        )
+        db_session.commit()
+
+        response = authenticated_client.get("/finance/export.csv")
 
-    def test_delete_expense(self, authenticated_client):
-        """Test deleting an expense record."""
-        response = authenticated_client.get("/del-expense/1", follow_redirects=True)
         assert response.status_code == 200
+        assert response.mimetype == "text/csv"
+        assert response.get_data(as_text=True).splitlines() == [
+            "type,date,amount,category_or_source,note",
+            "expense,2024-01-15T00:00:00,12.50,Food,lunch",
+            'income,2024-02-01T00:00:00,1500.00,"Acme, ""Inc""",',
+        ]
 
 
 class TestFinanceCalculations:
     """Test financial calculations and aggregations."""
 
-    def test_balance_calculation(self, app, test_user):
+    def test_balance_calculation(self, test_user, bulk_create):
         """Test balance = income - expenses."""
-        with app.app_context():
-            income = Income(
-                user_id=test_user.id,
-                amount=Decimal("1000.00"),
-                source="Salary",
-            )
-            expense = Expense(
-                user_id=test_user.id,
-                amount=Decimal("300.00"),
-                category="Food",
-            )
-            from app import db
+        from finflow.finance.service import get_totals
+
+        bulk_create(
+            Income,
+            [{"user_id": test_user.id, "amount_cents": 100000, "source": "Salary"}],
+        )
+        bulk_create(
+            Expense,
+            [{"user_id": test_user.id, "amount_cents": 30000, "category": "Food"}],
+        )
+
+        assert get_totals(test_user.id)["balance"] == 700.0
+
+    def test_totals_cache_follows_reassigned_expense(self, test_user, db_session):
+        """Test moving an expense to another user refreshes both users' totals."""
+        from finflow.auth.model import User
+        from finflow.finance.service import get_totals
+
+        other = User(name="Other User", email="other@example.com", password_hash="x")
+        expense = Expense(user_id=test_user.id, amount_cents=2500, category="Food")
+        db_session.add_all([other, expense])
+        db_session.commit()
+        assert get_totals(test_user.id)["expense"] == 25.0
+        assert get_totals(other.id)["expense"] == 0.0
 
-            db.session.add(income)
-            db.session.add(expense)
-            db.session.commit()
+        expense.user_id = other.id
+        db_session.commit()
 
-            expected_balance = Decimal("700.00")
-            assert True  # Calculation verified in dashboard
+        assert get_totals(test_user.id)["expense"] == 0.0
+        assert get_totals(other.id)["expense"] == 25.0
@@ -15,14 +15,17 @@ Design principles:
 from __future__ import annotations
 
 import re
-from datetime import date, datetime, timedelta
+from calendar import monthrange
+from datetime import date, datetime
 from decimal import Decimal, InvalidOperation
-from typing import Optional, Sequence, Tuple, Union
+from functools import lru_cache
+from typing import Optional, Pattern, Sequence, Tuple, Union
 
 __all__ = [
     "parse_amount",
     "parse_amount_or_zero",
     "format_amount",
+    "format_amount_default",
     "parse_date",
     "parse_date_or_today",
     "month_range",
@@ -32,8 +35,23 @@ Numeric = Union[int, float, Decimal]
 AmountInput = Union[str, Numeric, None]
 DateInput = Union[str, date, datetime, None]
 
-# Regex to strip currency symbols and whitespace
-_CURRENCY_RE = re.compile(r"[^\d\-\.\,()]+", flags=re.UNICODE)
+
+@lru_cache(maxsize=None)
+def _currency_re() -> Pattern[str]:
+    """Regex stripping currency symbols/whitespace, compiled on first non-ASCII use."""
+    return re.compile(r"[^\d\-\.\,()]+", flags=re.UNICODE)
+
+
+# Same stripping for ASCII input as a bytes.translate delete set (no regex engine).
+_NUMERIC_CHARS = "0123456789-.,()"
+_ASCII_STRIP_BYTES = bytes(i for i in range(128) if chr(i) not in _NUMERIC_CHARS)
+
+# Characters of a plain amount such as "500" or "-12.50" that Decimal() takes as-is.
+_PLAIN_AMOUNT_CHARS = "0123456789.-"
+
+# Shared (immutable) Decimal constants, rather than re-parsing them per call.
+_CENT = Decimal("0.01")
+_ZERO = Decimal("0.00")
 
 
 def _normalize_numeric_string(s: str) -> str:
@@ -56,7 +74,12 @@ def _normalize_numeric_string(s: str) -> str:
         raise ValueError("empty numeric string")
 
     # Remove currency letters/symbols but keep digits, commas, dots, parentheses and minus
-    cleaned = _CURRENCY_RE.sub("", orig)
+    if orig.isascii():
+        cleaned = (
+            orig.encode("ascii").translate(None, _ASCII_STRIP_BYTES).decode("ascii")
+        )
+    else:
+        cleaned = _currency_re().sub("", orig)
 
     # Detect parentheses -> negative
     is_negative = False
@@ -98,6 +121,33 @@ def _normalize_numeric_string(s: str) -> str:
     return cleaned
 
 
+@lru_cache(maxsize=4096)
+def _parse_amount_str(value: str) -> Decimal:
+    """
+    String branch of parse_amount, memoized per input string.
+
+    Form fields and CSV cells repeat the same few amounts; the Decimal result
+    is immutable so handing back the cached instance is safe. Failures raise
+    and are therefore never cached.
+    """
+    s = value.strip()
+    if s == "":
+        raise ValueError("empty amount string")
+    # Plain form/API input skips normalization; anything odd takes the full path.
+    if not s.strip(_PLAIN_AMOUNT_CHARS) and s.count(".") <= 1 and s.rfind("-") <= 0:
+        try:
+            return Decimal(s).quantize(_CENT)
+        except InvalidOperation:
+            pass
+    cleaned = _normalize_numeric_string(s)
+    try:
+        dec = Decimal(cleaned)
+        # Round to 2 decimal places (common for currencies)
+        return dec.quantize(_CENT)
+    except InvalidOperation as e:
+        raise ValueError(f"could not convert '{value}' to Decimal") from e
+
+
 def parse_amount(value: AmountInput) -> Decimal:
     """
     Parse a user-provided amount into Decimal.
@@ -119,29 +169,20 @@ def parse_amount(value: AmountInput) -> Decimal:
         raise ValueError("amount is None")
 
     if isinstance(value, Decimal):
-        return value.quantize(Decimal("0.01"))
+        return value.quantize(_CENT)
 
     if isinstance(value, (int,)):
-        return Decimal(value).quantize(Decimal("0.01"))
+        return Decimal(value).quantize(_CENT)
 
     if isinstance(value, float):
         # Convert via string to avoid binary float issues
         try:
-            return Decimal(str(value)).quantize(Decimal("0.01"))
+            return Decimal(str(value)).quantize(_CENT)
         except InvalidOperation as e:
             raise ValueError(f"invalid float amount: {value}") from e
 
     if isinstance(value, str):
-        s = value.strip()
-        if s == "":
-            raise ValueError("empty amount string")
-        cleaned = _normalize_numeric_string(s)
-        try:
-            dec = Decimal(cleaned)
-            # Round to 2 decimal places (common for currencies)
-            return dec.quantize(Decimal("0.01"))
-        except InvalidOperation as e:
-            raise ValueError(f"could not convert '{value}' to Decimal") from e
+        return _parse_amount_str(value)
 
     raise TypeError(f"unsupported amount type: {type(value).__name__}")
 
@@ -154,10 +195,10 @@ def parse_amount_or_zero(value: AmountInput) -> Decimal:
     """
     try:
         if value is None or (isinstance(value, str) and value.strip() == ""):
-            return Decimal("0.00")
+            return _ZERO
         return parse_amount(value)
     except (ValueError, TypeError):
-        return Decimal("0.00")
+        return _ZERO
 
 
 def format_amount(
@@ -179,16 +220,33 @@ def format_amount(
         except Exception:
             raise TypeError("amount must be numeric or Decimal")
 
+    if not currency and thousands_sep == ",":
+        return format_amount_default(amount)
+
     sign = "-" if amount < 0 else ""
-    amt = abs(amount).quantize(Decimal("0.01"))
-    # Split into integer and fractional parts
-    int_part, frac_part = divmod(amt, 1)
-    int_part = int(int_part)
-    frac_str = f"{frac_part:.2f}"[2:]  # get fractional digits
+    # Round once, then do the splitting and grouping on integer cents
+    cents = int(abs(amount).quantize(_CENT).scaleb(2))
+    int_part, frac = divmod(cents, 100)
 
     # Format integer with thousands separator
-    int_str = f"{int_part:,}".replace(",", thousands_sep)
-    return f"{sign}{currency}{int_str}.{frac_str}"
+    int_str = f"{int_part:,}"
+    if thousands_sep != ",":
+        int_str = int_str.replace(",", thousands_sep)
+    return f"{sign}{currency}{int_str}.{frac:02d}"
+
+
+def format_amount_default(amount: Decimal) -> str:
+    """
+    format_amount(amount) for a Decimal, without currency or separator options.
+
+    Meant for per-row rendering loops where the defaults always apply.
+
+    Example:
+      format_amount_default(Decimal('-1234.5')) -> '-1,234.50'
+    """
+    sign = "-" if amount < 0 else ""
+    int_part, frac = divmod(int(abs(amount).quantize(_CENT).scaleb(2)), 100)
+    return f"{sign}{int_part:,}.{frac:02d}"
 
 
 # Common date formats to try in order
@@ -204,6 +262,78 @@ _COMMON_DATE_FORMATS: Sequence[str] = (
     "%B %d, %Y",  # January 1, 2022
 )
 
+# _COMMON_DATE_FORMATS as one anchored regex, so a miss costs one match rather
+# than nine strptime calls. Day/month/year use strptime's own sub-patterns and
+# month names are the English (C locale) ones, so the accepted inputs match.
+_MONTH_NAMES = (
+    "january",
+    "february",
+    "march",
+    "april",
+    "may",
+    "june",
+    "july",
+    "august",
+    "september",
+    "october",
+    "november",
+    "december",
+)
+_MONTH_NUMBERS = {name: i for i, name in enumerate(_MONTH_NAMES, 1)}
+_MONTH_NUMBERS.update({name[:3]: i for i, name in enumerate(_MONTH_NAMES, 1)})
+_DAY_PAT = r"3[01]|[12]\d|0[1-9]|[1-9]| [1-9]"
+_MONTH_PAT = r"1[0-2]|0[1-9]|[1-9]"
+_MONTH_NAME_PAT = "|".join(sorted(_MONTH_NUMBERS, key=len, reverse=True))
+_MONTH_RE = re.compile(_MONTH_PAT)
+
+
+@lru_cache(maxsize=None)
+def _date_re() -> Pattern[str]:
+    """The combined _COMMON_DATE_FORMATS regex, compiled on first non-ISO date."""
+    return re.compile(
+        # %Y-%m-%d, %Y/%m/%d
+        rf"(?P<y1>\d{{4}})(?P<s1>[-/])(?P<m1>{_MONTH_PAT})(?P=s1)(?P<d1>{_DAY_PAT})"
+        # %d-%m-%Y, %d/%m/%Y, %m/%d/%Y (which of a/b is the month is decided below)
+        rf"|(?P<a2>{_DAY_PAT})(?P<s2>[-/])(?P<b2>{_DAY_PAT})(?P=s2)(?P<y2>\d{{4}})"
+        # %d %b %Y, %d %B %Y
+        rf"|(?P<d3>{_DAY_PAT})\s+(?P<n3>{_MONTH_NAME_PAT})\s+(?P<y3>\d{{4}})"
+        # %b %d, %Y, %B %d, %Y
+        rf"|(?P<n4>{_MONTH_NAME_PAT})\s+(?P<d4>{_DAY_PAT}),\s+(?P<y4>\d{{4}})",
+        flags=re.IGNORECASE,
+    )
+
+
+def _match_common_date(s: str) -> Optional[date]:
+    """Parse `s` as one of _COMMON_DATE_FORMATS (tried in order), or return None."""
+    m = _date_re().fullmatch(s)
+    if m is None:
+        return None
+    g = m.groupdict()
+    if g["y1"] is not None:
+        candidates = [(g["y1"], g["m1"], g["d1"])]
+    elif g["y2"] is not None:
+        a, b = g["a2"], g["b2"]
+        candidates = []
+        if _MONTH_RE.fullmatch(b):
+            candidates.append((g["y2"], b, a))
+        if g["s2"] == "/" and _MONTH_RE.fullmatch(a):
+            candidates.append((g["y2"], a, b))
+    else:
+        # Like strptime, names that only match case-insensitively via Unicode
+        # folding (e.g. a long s) are not found after lower() and are rejected.
+        if g["y3"] is not None:
+            year, name, day = g["y3"], g["n3"], g["d3"]
+        else:
+            year, name, day = g["y4"], g["n4"], g["d4"]
+        month = _MONTH_NUMBERS.get(name.lower())
+        candidates = [(year, month, day)] if month else []
+    for year, month, day in candidates:
+        try:
+            return date(int(year), int(month), int(day))
+        except ValueError:
+            continue
+    return None
+
 
 def parse_date(value: DateInput, try_formats: Optional[Sequence[str]] = None) -> date:
     """
@@ -244,12 +374,16 @@ def parse_date(value: DateInput, try_formats: Optional[Sequence[str]] = None) ->
         # Not ISO or not precise enough - fall back to known formats
         pass
 
-    formats = list(try_formats or _COMMON_DATE_FORMATS)
-    for fmt in formats:
-        try:
-            return datetime.strptime(s, fmt).date()
-        except Exception:
-            continue
+    if try_formats:
+        for fmt in try_formats:
+            try:
+                return datetime.strptime(s, fmt).date()
+            except Exception:
+                continue
+    else:
+        parsed = _match_common_date(s)
+        if parsed is not None:
+            return parsed
 
     # As a last attempt, handle simple numeric timestamps (seconds since epoch)
     if s.isdigit():
@@ -294,14 +428,9 @@ def month_range(month: str) -> Tuple[date, date]:
     year = int(parts[0])
     mon = int(parts[1])
 
+    # date() validates year/month (ValueError) before monthrange sees them
     start = date(year, mon, 1)
-    # Compute next month start then subtract one day
-    if mon == 12:
-        next_start = date(year + 1, 1, 1)
-    else:
-        next_start = date(year, mon + 1, 1)
-    end_inclusive = next_start - timedelta(days=1)
-    return start, end_inclusive
+    return start, date(year, mon, monthrange(year, mon)[1])
 
 
 # Example quick internal tests when module run directly